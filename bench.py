@@ -0,0 +1,171 @@
+"""
+bench.py — quick timings for the TXT → HTML pipeline (no bot / DB needed).
+
+Usage:  python bench.py [name ...]      (no names = run everything)
+"""
+
+import io
+import re
+import json
+import gzip
+import html.parser
+import os
+import sys
+import time
+import random
+import tempfile
+
+import txthtml
+
+
+def make_batch(lectures: int, seed: int = 1) -> str:
+    """Synthetic batch file in the formats users actually send."""
+    rnd   = random.Random(seed)
+    subs  = ["Physics", "Chemistry", "Maths by Sir", "Biology by Mam", "History", "Geography"]
+    tops  = ["Kinematics", "Optics", "Waves", "Atoms", "Algebra", "Polity", "Economy"]
+    hosts = ["https://cdn.example.com/vod/batch-2024/", "https://d1x2y3z4.cloudfront.net/course/77/"]
+    lines = []
+    for i in range(lectures):
+        s, t, host = rnd.choice(subs), rnd.choice(tops), rnd.choice(hosts)
+        name = rnd.choice([f"({s}) {t} #{i % 40}", f"{s} || {t} Class {i % 40}"])
+        lines.append(f"{name} : {host}{i:06d}/master.m3u8?sig=ABCDEF0123456789")
+        if rnd.random() < 0.15:
+            lines.append(f"{name} : {host}{i:06d}/notes.pdf")
+    return "\n".join(lines)
+
+
+def make_signed_batch(lectures: int, seed: int = 1) -> str:
+    """Like make_batch, but with the long signed-CDN URLs some panels export."""
+    rnd  = random.Random(seed)
+    root = "https://d3c33hcgiwev3.cloudfront.net/videos/encrypted/1705490/hls-ab12cd34ef56/"
+    tail = "/master.m3u8?Policy=eyJTdGF0ZW1lbnQiOlt7IlJlc291cmNlIjoiaHR0cHM6Ly9kM2MzM2hjZ2l3ZXYzLmNsb3VkZnJvbnQubmV0LyoiXX1dfQ__&Key-Pair-Id=K2HSABCDEF1234"
+    return "\n".join(f"(Batch {rnd.randint(1, 4)}) Lecture {i} : {root}{rnd.getrandbits(64):016x}{tail}"
+                     for i in range(lectures))
+
+
+def _timeit(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_shell():
+    """Per-page cost of the static shell (empty course)."""
+    empty = txthtml.Course()
+    n     = 2000
+    t     = _timeit(lambda: [txthtml.write_html("Batch", empty, io.BytesIO()) for _ in range(n)], 3)
+    print(f"shell      {t / n * 1e6:8.1f} µs/page")
+
+
+def bench_render():
+    """Full render of a 5k-lecture course."""
+    course = txthtml.structure_data_in_order(txthtml.extract_names_and_urls(make_batch(5000)))
+    buf    = io.BytesIO()
+
+    def run():
+        buf.seek(0)
+        buf.truncate()
+        txthtml.write_html("Batch", course, buf)
+
+    t = _timeit(run)
+    print(f"render     {t * 1e3:8.1f} ms  ({len(buf.getvalue()) / 1024:.0f} KiB, "
+          f"{txthtml.count_total_lectures(course)} lectures)")
+
+
+def bench_parallel():
+    """convert_file on a 200k-line dump: single process vs. map-reduce by core count."""
+    cores  = os.cpu_count() or 1
+    counts = [n for n in (2, 4, 8, 16) if n <= max(cores, 2)]
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = os.path.join(tmp, "all.txt"), os.path.join(tmp, "all.html")
+        with open(src, "w", encoding="utf-8") as f:
+            f.write(make_batch(175000))
+        mib  = os.path.getsize(src) / 2**20
+        base = _timeit(lambda: txthtml.convert_file(src, out, "All"), 2)
+        print(f"parallel   serial    {base * 1e3:8.1f} ms  ({mib:.1f} MiB, {cores} cores)")
+        for n in counts:
+            t = _timeit(lambda: txthtml.convert_file(src, out, "All", parallel_min_bytes=1, workers=n), 2)
+            print(f"parallel   {n:2d} procs {t * 1e3:8.1f} ms  x{base / t:.2f}")
+
+
+def bench_urls():
+    """Course markup size with and without the per-page URL dictionary."""
+    for label, text in (("batch", make_batch(5000)), ("signed", make_signed_batch(5000))):
+        course = txthtml.structure_data_in_order(txthtml.extract_names_and_urls(text))
+        plain  = len("".join(txthtml._iter_content_html(course, txthtml._UrlBook())).encode())
+        short  = len("".join(txthtml._iter_content_html(course)).encode())
+        print(f"urls       {label:7s} {plain / 1024:8.0f} KiB -> {short / 1024:.0f} KiB "
+              f"(-{1 - short / plain:.1%})")
+
+
+class _TagCounter(html.parser.HTMLParser):
+    """Counts the elements a page puts in the live DOM (<template> bodies are inert)."""
+
+    def __init__(self):
+        super().__init__()
+        self.elements = 0
+        self._inert   = 0
+
+    def handle_starttag(self, tag, attrs):
+        if not self._inert:
+            self.elements += 1
+        if tag == "template":
+            self._inert += 1
+
+    def handle_endtag(self, tag):
+        if tag == "template":
+            self._inert -= 1
+
+
+def bench_profiles():
+    """Full vs. lite vs. island page for 5k lectures: weight, DOM size, parse time, inline handlers."""
+    course = txthtml.structure_data_in_order(txthtml.extract_names_and_urls(make_batch(5000)))
+    for profile in ("full", "lite", "island"):
+        page = txthtml.generate_html("Batch", course, profile=profile)
+
+        def parse():
+            p = _TagCounter()
+            p.feed(page)
+            p.close()
+            return p
+
+        elements = parse().elements
+        t        = _timeit(parse, 3)
+        external = len(re.findall(r'<script src=|<link rel="stylesheet"', page))
+        handlers = re.findall(r' on[a-z]+="[^"]*"', page)
+        print(f"profile    {profile:5s} {len(page.encode()) / 1024:7.0f} KiB  "
+              f"gz {len(gzip.compress(page.encode())) / 1024:5.0f} KiB  "
+              f"{elements:6d} elements  parse {t * 1e3:6.1f} ms  {external} CDN files  "
+              f"{len(handlers)} inline handlers ({sum(map(len, handlers)) / 1024:.0f} KiB)")
+        island = re.search(r'id="course-data">(.*?)</script>', page, re.S)
+        if island:
+            t = _timeit(lambda: json.loads(island.group(1)), 3)
+            print(f"profile    {'':5s} {len(island.group(1).encode()) / 1024:7.0f} KiB JSON, loads in {t * 1e3:.1f} ms")
+        index = re.search(r'id="search-index">(.*?)</script>', page, re.S)
+        if index:
+            text = json.loads(index.group(1))
+            t    = _timeit(lambda: [text.count(q) for q in ("kin", "class 3", "zzz")], 3)
+            print(f"profile    {'':5s} {len(index.group(1).encode()) / 1024:7.0f} KiB search index, 3 scans in {t * 1e6:.0f} µs")
+
+
+def bench_assets():
+    """Bytes the CSS/JS minifier saves on every page."""
+    print(txthtml.minify_report())
+
+
+BENCHMARKS = {
+    "assets":   bench_assets,
+    "shell":    bench_shell,
+    "render":   bench_render,
+    "parallel": bench_parallel,
+    "urls":     bench_urls,
+    "profiles": bench_profiles,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
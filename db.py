@@ -43,6 +43,23 @@ async def upsert_user(user_id: int, username: str = None, full_name: str = None)
     )
 
 
+async def get_user_pref(user_id: int, key: str, default=None):
+    col = _col("users")
+    if col is None:
+        return default
+    doc = await col.find_one({"_id": user_id}, {f"prefs.{key}": 1})
+    return ((doc or {}).get("prefs") or {}).get(key, default)
+
+
+async def set_user_pref(user_id: int, key: str, value) -> bool:
+    """Store a per-user setting; returns False when there is no DB to keep it."""
+    col = _col("users")
+    if col is None:
+        return False
+    await col.update_one({"_id": user_id}, {"$set": {f"prefs.{key}": value}}, upsert=True)
+    return True
+
+
 async def count_users() -> int:
     col = _col("users")
     return await col.count_documents({}) if col is not None else 0
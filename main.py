@@ -9,9 +9,12 @@ import os
 import asyncio
 import shutil
 import datetime
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import txthtml
-from vars import API_ID, API_HASH, BOT_TOKEN, FORCE_SUB_CHANNEL, ADMINS, MONGO_URI, LOG_CHANNEL, PYROGRAM_PROXY
+from vars import API_ID, API_HASH, BOT_TOKEN, FORCE_SUB_CHANNEL, ADMINS, MONGO_URI, LOG_CHANNEL, PYROGRAM_PROXY, CONVERT_WORKERS, COMPRESS_MIN_LECTURES, PARALLEL_MIN_MB, SPLIT_MIN_LECTURES, SPLIT_MIN_SUBJECTS, ISLAND_MIN_LECTURES
 import db as database
 
 from pyrogram import Client, filters
@@ -25,8 +28,13 @@ from pyrogram.errors import UserNotParticipant, FloodWait
 bot = Client("bot", api_id=API_ID, api_hash=API_HASH, bot_token=BOT_TOKEN, proxy=PYROGRAM_PROXY)
 
 DOWNLOADS_DIR   = "./downloads"
-MAX_TXT_SIZE_MB = 10
-ENCODINGS       = ("utf-8", "utf-8-sig", "latin-1", "cp1252")
+MAX_TXT_SIZE_MB = 50
+ENCODINGS       = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
+
+# Conversions run here, off the event loop (created on first use)
+_pool = None
+# Conversions submitted to _pool and not finished yet
+_running = 0
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -71,7 +79,7 @@ async def _send_log(
                 LOG_CHANNEL,
                 media=[
                     InputMediaDocument(media=txt_path,  caption=caption),
-                    InputMediaDocument(media=html_path, caption=f"🌐 `{file_name}.html`"),
+                    InputMediaDocument(media=html_path, caption=f"🌐 `{os.path.basename(html_path)}`"),
                 ],
             )
         elif txt_ok:
@@ -89,18 +97,49 @@ def _is_admin(user_id: int) -> bool:
     return user_id in ADMINS
 
 
-def _read_file(path: str) -> str:
-    """Try multiple encodings; raise ValueError if all fail."""
-    for enc in ENCODINGS:
-        try:
-            with open(path, "r", encoding=enc) as f:
-                return f.read()
-        except (UnicodeDecodeError, LookupError):
-            continue
-    raise ValueError(
-        "File ko decode nahi kar saka. "
-        "Please UTF-8 encoded `.txt` file bhejo."
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=CONVERT_WORKERS)
+    return _pool
+
+
+async def _convert(txt_path: str, html_path: str, file_name: str, profile: str = "full") -> tuple:
+    """
+    Run the TXT → HTML conversion in the worker pool so the event loop
+    keeps serving other users. Returns (output_path, lecture_count); the
+    output is a .zip of per-subject pages for very large courses.
+    A big file may fan out only into the pool slots no other conversion
+    is using when it starts, instead of a CPU-sized pool of its own.
+    """
+    global _pool, _running
+    loop = asyncio.get_running_loop()
+    job  = functools.partial(
+        txthtml.convert_file, txt_path, html_path, file_name,
+        encodings=ENCODINGS,
+        compress_min_lectures=COMPRESS_MIN_LECTURES,
+        parallel_min_bytes=int(PARALLEL_MIN_MB * 1024 * 1024),
+        workers=max(1, CONVERT_WORKERS - _running),
+        split_min_lectures=SPLIT_MIN_LECTURES,
+        split_min_subjects=SPLIT_MIN_SUBJECTS,
+        profile=profile,
+        island_min_lectures=ISLAND_MIN_LECTURES,
     )
+    _running += 1
+    try:
+        out_path, lec_count = await loop.run_in_executor(_get_pool(), job)
+    except UnicodeError:
+        raise ValueError(
+            "File ko decode nahi kar saka. "
+            "Please UTF-8 encoded `.txt` file bhejo."
+        )
+    except BrokenProcessPool:
+        # A worker died (usually OOM) — start a fresh pool next time.
+        _pool = None
+        raise
+    finally:
+        _running -= 1
+    return out_path, lec_count
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -181,7 +220,8 @@ async def help_command(client: Client, message: Message):
         "**Commands:**\n"
         "• /start — Welcome\n"
         "• /help — Yeh message\n"
-        "• /history — Teri last 7 conversions\n\n"
+        "• /history — Teri last 7 conversions\n"
+        "• /lite — Lite HTML on/off (purane / 2 GB phones ke liye)\n\n"
         "**Supported .txt formats:**\n"
         "`Name : URL`\n"
         "`Subject || Topic #1 : URL`\n"
@@ -227,6 +267,24 @@ async def history_command(client: Client, message: Message):
     await message.reply_text("\n".join(lines), quote=True)
 
 
+@bot.on_message(filters.command("lite") & filters.private)
+async def lite_command(client: Client, message: Message):
+    if not await check_force_sub(client, message):
+        return
+    uid  = message.from_user.id
+    lite = not await database.get_user_pref(uid, "lite", False)
+    if not await database.set_user_pref(uid, "lite", lite):
+        await message.reply_text("⚠️ Database connected nahi hai — setting save nahi ho sakti.", quote=True)
+        return
+    if lite:
+        text = ("🪶 **Lite mode ON**\n\n"
+                "Ab HTML halka banega: native player, koi heavy effects nahi — "
+                "purane / 2 GB phones pe fast chalega.\n\nWapas full mode ke liye /lite bhejo.")
+    else:
+        text = "✨ **Full mode ON**\n\nPlyr player, animations aur saare features wapas."
+    await message.reply_text(text, quote=True)
+
+
 # ── Admin commands ─────────────────────────────────────────────────────────
 
 @bot.on_message(filters.command("stats") & filters.private)
@@ -350,36 +408,37 @@ async def handle_document(client: Client, message: Message):
 
     try:
         # 4. Download
-        os.makedirs(user_dir, exist_ok=True)
+        await asyncio.to_thread(os.makedirs, user_dir, exist_ok=True)
         downloaded_path = await message.download(
             file_name=os.path.join(user_dir, safe_name)
         )
 
         await prog.edit_text("`⚙️ Processing aur HTML generate ho raha hai...`")
 
-        # 5. Read with encoding fallback
-        file_content = _read_file(downloaded_path)
-
-        # 6. Convert
-        urls            = txthtml.extract_names_and_urls(file_content)
-        structured_list = txthtml.structure_data_in_order(urls)
-        html_content    = txthtml.generate_html(file_name_only, structured_list)
-        lec_count       = txthtml.count_total_lectures(structured_list)
-
-        # 7. Save HTML
-        html_path = os.path.join(user_dir, file_name_only + ".html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        # 5-7. Decode, parse, render and save HTML in the worker pool
+        lite = await database.get_user_pref(message.from_user.id, "lite", False)
+        html_path, lec_count = await _convert(
+            downloaded_path,
+            os.path.join(user_dir, file_name_only + ".html"),
+            file_name_only,
+            "lite" if lite else "full",
+        )
 
         # 8. Upload
         await prog.edit_text("`📤 File upload ho rahi hai...`")
+        if html_path.endswith(".zip"):
+            how_to = "ℹ️ Bada course hai — ZIP extract karo aur `index.html` browser mein kholo (Chrome recommended)."
+        elif lite:
+            how_to = "🪶 Lite HTML — browser mein open karo. Full version ke liye /lite bhejo."
+        else:
+            how_to = "ℹ️ Browser mein open karo (Chrome recommended)."
         await message.reply_document(
             document=html_path,
             caption=(
                 f"✅ **Conversion Successful!**\n\n"
-                f"📄 File: `{file_name_only}.html`\n"
+                f"📄 File: `{os.path.basename(html_path)}`\n"
                 f"📚 Lectures: `{lec_count}`\n\n"
-                f"ℹ️ Browser mein open karo (Chrome recommended)."
+                f"{how_to}"
             ),
             quote=True,
         )
@@ -412,7 +471,7 @@ async def handle_document(client: Client, message: Message):
 
     finally:
         # Clean up the entire per-message download folder
-        shutil.rmtree(user_dir, ignore_errors=True)
+        await asyncio.to_thread(shutil.rmtree, user_dir, ignore_errors=True)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -478,6 +537,7 @@ async def show_help_callback(client: Client, callback_query: CallbackQuery):
 if __name__ == "__main__":
     os.makedirs(DOWNLOADS_DIR, exist_ok=True)
     database.init_db(MONGO_URI)
+    print(txthtml.minify_report())
 
     print(r"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -497,6 +557,9 @@ if __name__ == "__main__":
 
     bot.run()
 
+    if _pool is not None:
+        _pool.shutdown()
+
     print("""
 ╔══════════════════════════════════════════════════════════════╗
 ║                    🛑 Bot stopped.                          ║
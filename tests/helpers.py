@@ -0,0 +1,50 @@
+"""
+Small helpers shared by the test modules.
+"""
+
+import txthtml
+
+
+EDGE_LINES = """\
+# comment line
+(Physics) Kinematics #1: https://cdn.example.com/v/1.m3u8
+(Physics) Kinematics #1: https://cdn.example.com/v/1-notes.pdf
+(Physics) || Kinematics #2 : https://cdn.example.com/v/2.mp4?a=1&b=2
+Maths by Sir || Algebra Class 3: https://youtu.be/dQw4w9WgXcQ
+Biology by Mam||Cells: https://cdn.example.com/v/cells.mp4
+History || Mughals #4: https://cdn.example.com/v/m.pdf
+History || Mughals #4: https://cdn.example.com/v/m.mp4
+Just a title: https://cdn.example.com/v/plain.mp4
+Just a title: https://cdn.example.com/v/plain.mp4
+
+no colon here
+: https://cdn.example.com/v/no-name.mp4
+Empty url:
+   Padded name   :   https://cdn.example.com/v/padded.mp4
+(Ünïcode) Тема #7: https://cdn.example.com/v/ü.mp4
+"""
+
+
+def course(text):
+    return txthtml.structure_data_in_order(txthtml.extract_names_and_urls(text))
+
+
+def lectures(course):
+    return [l for s in course for l in s.direct_lectures + [x for t in s.topics.values() for x in t.lectures]]
+
+
+def dump(course):
+    """Course tree (new or baseline list form) as comparable rows."""
+    rows = []
+    for sub in course:
+        if isinstance(sub, dict):
+            groups = [("", sub.get("direct_lectures", []))]
+            groups += [(t["name"], t["lectures"]) for t in sub["topics"].values()]
+            for tname, lecs in groups:
+                rows += [(sub["name"], tname, l["title"], tuple(l["videos"]), tuple(l["pdfs"]), l["lid"])
+                         for l in lecs]
+        else:
+            groups = [("", sub.direct_lectures)] + [(t.name, t.lectures) for t in sub.topics.values()]
+            for tname, lecs in groups:
+                rows += [(sub.name, tname, l.title, l.videos, l.pdfs, l.old) for l in lecs]
+    return rows
@@ -0,0 +1,33 @@
+"""
+Bulk converter CLI: the manifest skips files that have not changed.
+"""
+
+import json
+import os
+
+import bench
+import txthtml
+
+
+def test_cli_skips_unchanged_files(tmp_path, capsys):
+    in_dir, out_dir = tmp_path / "in", tmp_path / "out"
+    (in_dir / "sub").mkdir(parents=True)
+    (in_dir / "one.txt").write_text(bench.make_batch(50, seed=1), encoding="utf-8")
+    (in_dir / "sub" / "two.txt").write_text(bench.make_batch(60, seed=2), encoding="utf-8")
+    run = lambda *extra: txthtml.cli(["convert", str(in_dir), str(out_dir), "-j", "1", *extra])
+
+    assert run() == 0
+    manifest = json.loads((out_dir / txthtml._MANIFEST_NAME).read_text())
+    assert sorted(manifest) == ["one.txt", os.path.join("sub", "two.txt")]
+    assert (out_dir / "sub" / "two.html").exists()
+    assert "2 converted, 0 unchanged" in capsys.readouterr().err
+
+    assert run() == 0
+    assert "0 converted, 2 unchanged" in capsys.readouterr().err
+
+    (in_dir / "one.txt").write_text(bench.make_batch(55, seed=1), encoding="utf-8")
+    assert run() == 0
+    assert "1 converted, 1 unchanged" in capsys.readouterr().err
+
+    assert run("--force") == 0
+    assert "2 converted, 0 unchanged" in capsys.readouterr().err
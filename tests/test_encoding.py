@@ -0,0 +1,38 @@
+"""
+Input sniffing: encodings whose tell-tale bytes sit outside the sample.
+"""
+
+import json
+
+import bench
+import txthtml
+
+
+ENCODINGS = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
+
+
+def test_late_cp1252_bytes_are_not_replaced(tmp_path):
+    lines = bench.make_batch(3000).splitlines()
+    lines[len(lines) // 2] = "(Maths) Café “quoted”: https://x.example/c.mp4"
+    src = tmp_path / "a.txt"
+    src.write_bytes("\n".join(lines).encode("cp1252"))
+    with open(src, "rb") as f:
+        assert txthtml.sniff_input(f, ENCODINGS) == ("text", "utf-8")   # ASCII head and tail
+    for workers in (1, 2):
+        out, _ = txthtml.convert_file(str(src), str(tmp_path / "a.html"), "a", ENCODINGS,
+                                      parallel_min_bytes=1, workers=workers)
+        page = open(out, encoding="utf-8").read()
+        assert "Café “quoted”" in page and "�" not in page
+
+
+def test_late_cp1252_bytes_in_a_json_export(tmp_path):
+    chapters = [{"subject_id": f"S{i % 4}", "title": f"Chapter {i}", "link": f"https://x.example/{i}.mp4"}
+                for i in range(1000)]
+    chapters[500]["title"] = "Café “quoted”"
+    src = tmp_path / "a.json"
+    src.write_bytes(json.dumps({"data": {"chapters": chapters}}, ensure_ascii=False).encode("cp1252"))
+    assert src.stat().st_size > 4 * txthtml._SNIFF_BYTES
+    out, n = txthtml.convert_file(str(src), str(tmp_path / "a.html"), "a", ENCODINGS)
+    page = open(out, encoding="utf-8").read()
+    assert n == 1000
+    assert "Café “quoted”" in page and "�" not in page
@@ -0,0 +1,34 @@
+"""
+Format sniffing: the reader chosen from the sample must not lose lines
+that only appear past it.
+"""
+
+import txthtml
+import baseline_parser as baseline
+
+
+def test_csv_looking_head_then_text_lines():
+    text  = "".join(f"Lec {i},https://x.example/{i}.mp4\n" for i in range(20))
+    text += "".join(f"(Physics) Topic {i}: https://x.example/p{i}.mp4\n" for i in range(30))
+    assert txthtml.sniff_format(text) == "csv"
+    pairs = txthtml.extract_names_and_urls(text)
+    assert len(pairs) == 50
+    assert pairs[20:] == baseline.extract_names_and_urls(text)[20:]
+
+
+def test_csv_header_then_text_lines():
+    text  = "Title,Link\n"
+    text += "".join(f"(Maths) Algebra {i}: https://x.example/a{i}.mp4\n" for i in range(10))
+    assert txthtml.sniff_format(text) == "csv"
+    pairs = txthtml.extract_names_and_urls(text)
+    assert len(pairs) == 10 and pairs == baseline.extract_names_and_urls(text)
+
+
+def test_csv_rows_keep_their_columns():
+    text = ("Subject,Title,Link\n"
+            "Physics,Waves,https://x.example/w.mp4\n"
+            "\"Maths, Pure\",\"Sets, Part 1\",https://x.example/s.mp4\n")
+    assert txthtml.extract_names_and_urls(text) == [
+        ("(Physics) Waves", "https://x.example/w.mp4"),
+        ("(Maths, Pure) Sets, Part 1", "https://x.example/s.mp4"),
+    ]
@@ -0,0 +1,31 @@
+"""
+JSON_DATA exports: the streaming chapters reader against json.loads.
+"""
+
+import io
+import json
+
+import pytest
+
+import txthtml
+import baseline_parser as baseline
+from helpers import course, dump
+
+
+def test_json_chapters_match_baseline():
+    chapters = [{"subject_id": f"S{i % 3}", "title": f"Chapter {i} #{i % 2}", "link": f"https://x.example/{i}.mp4"}
+                for i in range(30)]
+    text = json.dumps({"data": {"chapters": chapters}})
+    new  = course(text)
+    old  = baseline.structure_data_in_order(baseline.extract_names_and_urls(text))
+    assert dump(new) == dump(old)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 256, 4096])
+def test_json_parse_is_chunk_size_independent(chunk_size):
+    chapters = [{"subject_id": "Sub {x}", "title": f'Ch {i} "q" \\ {{}} ü€ #{i}', "link": f"https://x.example/{i}.mp4",
+                 "extra": {"nested": [1, {"a": "}"}]}} for i in range(40)]
+    data = json.dumps({"data": {"chapters": chapters}, "tail": "]}"}, ensure_ascii=False).encode("utf-8")
+    whole = list(txthtml.iter_names_and_urls(io.BytesIO(data), "utf-8", chunk_size=1 << 20))
+    assert len(whole) == 40
+    assert list(txthtml.iter_names_and_urls(io.BytesIO(data), "utf-8", chunk_size=chunk_size)) == whole
@@ -0,0 +1,29 @@
+"""
+Lecture ids: stable across edits to the course file, distinct for repeats.
+"""
+
+import bench
+from helpers import course
+
+
+def _lids(text):
+    c = course(text)
+    return {(s.name, l.title, l.videos): l.lid
+            for s in c for l in s.direct_lectures + [x for t in s.topics.values() for x in t.lectures]}
+
+
+def test_lids_survive_appended_and_inserted_lectures():
+    text   = bench.make_batch(500)
+    before = _lids(text)
+    grown  = "(Extra) Intro: https://x.example/intro.mp4\n" + text + "\n(Extra) Outro: https://x.example/outro.mp4\n"
+    after  = _lids(grown)
+    assert len(after) == len(before) + 2
+    assert all(after[k] == lid for k, lid in before.items())
+
+
+def test_exact_repeats_get_distinct_lids():
+    line = "Same || Title: https://x.example/same.mp4\n"
+    lids = list(_lids(line).values())
+    assert len(lids) == 1
+    got  = [l.lid for l in course(line * 3)[0].topics["Title"].lectures]
+    assert len(set(got)) == 3 and got[0] == lids[0]
@@ -0,0 +1,19 @@
+"""
+Lite profile: plain markup only, never a compressed payload.
+"""
+
+import pytest
+
+import bench
+import txthtml
+from helpers import course
+
+
+def test_lite_pages_are_never_compressed(tmp_path):
+    src = tmp_path / "a.txt"
+    src.write_text(bench.make_batch(1200), encoding="utf-8")
+    out, _ = txthtml.convert_file(str(src), str(tmp_path / "a.html"), "a",
+                                  compress_min_lectures=1000, profile="lite")
+    assert 'id="course-payload"' not in open(out, encoding="utf-8").read()
+    with pytest.raises(ValueError):
+        txthtml.generate_html("a", course("A: https://x.example/a.mp4"), compress="gzip", profile="lite")
@@ -0,0 +1,36 @@
+"""
+Map-reduce parsing: split spans merge back into the one-pass result.
+"""
+
+import pytest
+
+import bench
+import txthtml
+from helpers import EDGE_LINES, course, dump
+
+
+def _span_course(lines):
+    return txthtml._build_course(txthtml._iter_text_pairs(txthtml._iter_lines(("".join(lines),))), None)
+
+
+@pytest.mark.parametrize("cuts", [(1,), (2, 3), (5, 9, 10), tuple(range(1, 16))])
+def test_merged_spans_equal_one_pass(cuts):
+    # Cut between a video and its PDF, inside exact repeats, around blanks.
+    lines  = EDGE_LINES.splitlines(True) * 2
+    bounds = [0, *cuts, len(lines)]
+    merged = txthtml._merge_courses([_span_course(lines[a:b]) for a, b in zip(bounds, bounds[1:])])
+    serial = course("".join(lines))
+    lids   = lambda c: [l.lid for s in c for l in s.direct_lectures + [x for t in s.topics.values() for x in t.lectures]]
+    assert dump(merged) == dump(serial)
+    assert lids(merged) == lids(serial)
+
+
+def test_parallel_output_equals_serial(tmp_path):
+    src = tmp_path / "all.txt"
+    src.write_text(bench.make_batch(6000), encoding="utf-8")
+    serial, n = txthtml.convert_file(str(src), str(tmp_path / "serial.html"), "All")
+    para, m   = txthtml.convert_file(str(src), str(tmp_path / "para.html"), "All",
+                                     parallel_min_bytes=1, workers=3)
+    assert n == m == 6000
+    with open(serial, "rb") as a, open(para, "rb") as b:
+        assert a.read() == b.read()
@@ -0,0 +1,45 @@
+"""
+Parsing regressions: the streaming, table-driven parser against the
+original one (baseline_parser), and independence from read chunking.
+"""
+
+import io
+
+import pytest
+
+import bench
+import txthtml
+import baseline_parser as baseline
+from helpers import EDGE_LINES, course, dump
+
+
+@pytest.fixture(params=["edge", "batch", "parts"])
+def text(request):
+    if request.param == "edge":
+        return EDGE_LINES
+    if request.param == "batch":
+        return bench.make_batch(2000)
+    # subjects that look like "Part 1", "Part 2"... are regrouped
+    return "".join(f"Part {p} || Lesson {i}: https://x.example/{p}/{i}.mp4\n" for p in range(1, 6) for i in range(4))
+
+
+def test_pairs_match_baseline(text):
+    assert txthtml.extract_names_and_urls(text) == baseline.extract_names_and_urls(text)
+
+
+def test_parse_line_matches_baseline(text):
+    for name, _ in baseline.extract_names_and_urls(text):
+        assert txthtml.parse_line(name) == baseline.parse_line(name), name
+
+
+def test_course_and_legacy_lids_match_baseline(text):
+    new = course(text)
+    old = baseline.structure_data_in_order(baseline.extract_names_and_urls(text))
+    assert dump(new) == dump(old)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_text_parse_is_chunk_size_independent(chunk_size):
+    data  = EDGE_LINES.replace("\n", "\r\n").encode("utf-8")
+    whole = txthtml.extract_names_and_urls(EDGE_LINES)
+    assert list(txthtml.iter_names_and_urls(io.BytesIO(data), "utf-8", chunk_size=chunk_size)) == whole
@@ -0,0 +1,42 @@
+"""
+URL book: every data-u reference expands back to the original link.
+"""
+
+import html
+import json
+import re
+
+import pytest
+
+import bench
+import txthtml
+from helpers import course as _course, lectures as _lectures
+
+
+def _expand(book, ref):
+    """What the page runtime does with a data-u reference."""
+    head, _, rest = ref.partition(":")
+    pre, _, suf = head.partition(",")
+    return (book["p"][int(pre)] if pre else "") + rest + (book["s"][int(suf)] if suf else "")
+
+
+@pytest.mark.parametrize("make", [bench.make_batch, bench.make_signed_batch])
+def test_url_book_round_trip(make):
+    course = _course(make(3000))
+    book   = txthtml._build_url_book(course)
+    data   = {"p": book.prefixes, "s": book.suffixes}
+    urls   = [u for l in _lectures(course) for u in l.videos]
+    refs   = [book.encode(u) for u in urls]
+    assert any(refs)
+    for url, ref in zip(urls, refs):
+        assert not ref or _expand(data, ref) == url
+
+
+def test_page_links_decode_to_the_original_urls():
+    course = _course(bench.make_signed_batch(400))
+    page   = txthtml.generate_html("B", course, readable=True)
+    data   = json.loads(re.search(r'id="url-book">(.*?)</script>', page).group(1))
+    links  = re.findall(r'class="list-item video-item"[^>]* data-(u|url|yt)="([^"]*)"', page)
+    want   = [u for l in _lectures(course) for u in l.videos]
+    got    = [_expand(data, html.unescape(v)) if k == "u" else html.unescape(v) for k, v in links if k != "yt"]
+    assert got == [u for u in want if txthtml._get_youtube_id(u) is None]
@@ -0,0 +1,94 @@
+"""
+The page's watched store, run under node against a stubbed localStorage.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import bench
+import txthtml
+from helpers import course as _course, lectures as _lectures
+
+
+_WATCHED_HARNESS = """
+var store = %s, FILE_KEY = 'K', IDS = %s;
+var localStorage = { getItem: function (k) { return k in store ? store[k] : null; },
+  setItem: function (k, v) { store[k] = v; }, removeItem: function (k) { delete store[k]; } };
+var document = { getElementById: function (id) { return id in IDS ? { textContent: IDS[id] } : null; } };
+var atob = function (s) { return Buffer.from(s, 'base64').toString('latin1'); };
+var btoa = function (s) { return Buffer.from(s, 'latin1').toString('base64'); };
+%s
+var lids = %s, watched = _wRead(lids), done = _wFold(lids, watched), marks = %s;
+marks.forEach(function (lid) { watched.add(lid); });
+localStorage.setItem(FILE_KEY + '_wb', JSON.stringify(_wEncode(lids, watched, %s)));
+if (done) done();
+process.stdout.write(JSON.stringify({ watched: [...watched], store: store }));
+"""
+
+
+@pytest.fixture
+def page(tmp_path):
+    """Open the page showing subjects (default: the whole course), mark marks, store."""
+    if not shutil.which("node"):
+        pytest.skip("needs node")
+
+    def run(course, store, marks=(), subjects=None):
+        shown = course if subjects is None else subjects
+        ids   = dict(re.findall(r'id="(lid-alias|lecture-ord)">(.*?)</script>',
+                                txthtml._lid_aliases(shown) + txthtml._lecture_ords(shown)))
+        js    = _WATCHED_HARNESS % (json.dumps(store), json.dumps(ids), txthtml._WATCHED_JS,
+                                    json.dumps([l.lid for l in _lectures(shown)]), json.dumps(list(marks)),
+                                    json.dumps(subjects is None))
+        (tmp_path / "h.js").write_text(js, encoding="utf-8")
+        res = json.loads(subprocess.run(["node", str(tmp_path / "h.js")], capture_output=True,
+                                        text=True, check=True).stdout)
+        return set(res["watched"]), res["store"]
+
+    return run
+
+
+def _tags(store):
+    return len(json.loads(store["K_wb"])["t"]) // 8
+
+
+def test_watched_marks_survive_appends_and_legacy_lids(page):
+    text   = bench.make_batch(300)
+    lecs   = _lectures(_course(text))
+    legacy = [lecs[3].old, lecs[40].old, "lnot-a-lecture"]
+    watched, store = page(_course(text), {"K_w": json.dumps(legacy)}, [lecs[7].lid])
+    assert watched == {lecs[3].lid, lecs[40].lid, lecs[7].lid}
+    assert json.loads(store["K_w"]) == ["lnot-a-lecture"]
+    assert _tags(store) == 3
+
+    lines = text.splitlines()
+    grown = "\n".join(["(Extra) Intro: https://x.example/i.mp4"] + lines[:100] + ["(Extra) Mid: https://x.example/m.mp4"]
+                      + lines[100:] + [f"(Extra) Outro {i}: https://x.example/o{i}.mp4" for i in range(30)])
+    watched_again, store = page(_course(grown), store)
+    assert watched_again == watched
+    assert _tags(store) == 3
+
+
+def test_whole_course_page_prunes_removed_lectures(page):
+    text = bench.make_batch(300)
+    lecs = _lectures(_course(text))
+    _, store = page(_course(text), {}, [lecs[3].lid, lecs[40].lid])
+    lines = [l for l in text.splitlines() if lecs[40].videos[0] not in l]
+    watched, store = page(_course("\n".join(lines)), store)
+    assert watched == {lecs[3].lid}
+    assert _tags(store) == 1
+
+
+def test_split_pages_share_one_record(page):
+    course = _course(bench.make_batch(300))
+    first, rest = tuple(course[:1]), tuple(course[1:])
+    a, b   = _lectures(first)[2].lid, _lectures(rest)[5].lid
+    _, store       = page(course, {}, [a], subjects=first)
+    watched, store = page(course, store, [b], subjects=rest)
+    assert watched == {b}
+    watched, store = page(course, store, subjects=first)
+    assert watched == {a}
+    assert page(course, store)[0] == {a, b}
@@ -8,7 +8,8 @@ Fixes in v3.1:
 • Footer now shows Telegram link @BabuBhaiKundan with text "Babu Bhai Kundan"
 """
 
-import re, html, json, hashlib, textwrap
+import re, csv, html, json, hashlib, textwrap, codecs, itertools, collections, sys, io, os, tempfile, zlib, base64, functools
+import contextlib, concurrent.futures, zipfile, time
 
 # ── YouTube URL detector ───────────────────────────────────────────────────
 _YT_RE = re.compile(
@@ -29,15 +30,42 @@ def _get_youtube_id(url: str):
 #  DATA EXTRACTION
 # ═══════════════════════════════════════════════════════════════════════════
 
-def extract_names_and_urls(file_content: str) -> list:
-    file_content = file_content.strip()
-    if file_content.startswith("{") and file_content.endswith("}"):
-        try:
-            return [("JSON_DATA", json.loads(file_content))]
-        except json.JSONDecodeError:
-            pass
-    pairs = []
-    for line in file_content.splitlines():
+_READ_CHUNK = 64 * 1024
+
+
+def _iter_chunks(fp, encoding: str, chunk_size: int, errors: str = "strict"):
+    """Yield decoded text chunks from a text or binary file object."""
+    decoder = None
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)(errors)
+            chunk = decoder.decode(chunk)
+            if not chunk:
+                continue
+        yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def _iter_lines(chunks):
+    """Split a chunk stream into lines, holding at most one partial line."""
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(True)
+        pending = lines.pop() if lines else ""
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _iter_text_pairs(lines):
+    for line in lines:
         line = line.strip()
         if not line or line.startswith("#"):
             continue
@@ -45,97 +73,684 @@ def extract_names_and_urls(file_content: str) -> list:
             name, _, url = line.partition(":")
             name, url = name.strip(), url.strip()
             if name and url:
-                pairs.append((name, url))
-    return pairs
+                yield name, url
+
+
+# ── Incremental JSON reader ────────────────────────────────────────────────
+# Course-platform exports look like {"data": {"chapters": [{...}, ...]}, ...}
+# and are mostly fields we never use.  _JsonStream walks the document
+# straight off the chunk stream: only data.chapters[*].{subject_id,title,
+# link} are decoded, everything else is skipped without being built, and
+# only the unread window of the input stays buffered.
+
+_JSON_WS         = re.compile(r"[ \t\n\r]*")
+_JSON_STRUCT     = re.compile(r'["{}\[\]]')
+_JSON_STR_TAIL   = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_SCALAR     = re.compile(r'[^,\]}\s]+')
+_JSON_SCALAR_OK  = re.compile(r'true|false|null|-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?$')
+_JSON_DECODER    = json.JSONDecoder()
+_CHAPTER_FIELDS  = ("subject_id", "title", "link")
+
+
+class _JsonStream:
+    def __init__(self, chunks, head: str = ""):
+        self._chunks = chunks
+        self.buf     = head
+        self.pos     = 0
+        self.dropped = 0      # chars discarded from the front of buf
+
+    def _fill(self) -> bool:
+        for chunk in self._chunks:
+            if self.pos >= _READ_CHUNK:
+                self.dropped += self.pos
+                self.buf = self.buf[self.pos:]
+                self.pos = 0
+            self.buf += chunk
+            return True
+        return False
+
+    def _error(self, msg: str):
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next char ('' at end of input)."""
+        if self.pos < len(self.buf) and self.buf[self.pos] not in " \t\n\r":
+            return self.buf[self.pos]
+        while True:
+            self.pos = _JSON_WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise self._error(f"Expecting {ch!r}")
+        self.pos += 1
+
+    def _ensure_scalar(self) -> None:
+        # A number cut at the buffer edge would still decode — read on
+        # until the token is terminated.
+        while True:
+            m = _JSON_SCALAR.match(self.buf, self.pos)
+            if m is None:
+                raise self._error("Expecting value")
+            if m.end() < len(self.buf) or not self._fill():
+                return
+
+    def value(self):
+        """Decode and return the next value."""
+        ch = self.peek()
+        if ch not in '"{[':
+            self._ensure_scalar()
+        while True:
+            try:
+                obj, self.pos = _JSON_DECODER.raw_decode(self.buf, self.pos)
+                return obj
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def decode_buffered(self):
+        """
+        Decode the next value if it lies wholly inside the buffered window,
+        returning (True, value); otherwise consume nothing and return
+        (False, None).
+        """
+        self.peek()
+        try:
+            obj, self.pos = _JSON_DECODER.raw_decode(self.buf, self.pos)
+            return True, obj
+        except json.JSONDecodeError:
+            return False, None
+
+    def _skip_string(self) -> None:
+        while True:
+            m = _JSON_STR_TAIL.match(self.buf, self.pos + 1)
+            if m is not None:
+                self.pos = m.end()
+                return
+            if not self._fill():
+                raise self._error("Unterminated string")
+
+    def skip(self) -> None:
+        """Step over the next value without building it."""
+        ch = self.peek()
+        if ch == '"':
+            self._skip_string()
+            return
+        if ch not in "{[":
+            self._ensure_scalar()
+            m = _JSON_SCALAR.match(self.buf, self.pos)
+            if not _JSON_SCALAR_OK.match(m.group()):
+                raise self._error("Expecting value")
+            self.pos = m.end()
+            return
+        # A container that already sits inside the buffered window is
+        # stepped over by the C scanner and the result dropped at once;
+        # anything larger falls through to the bracket-counting scan.
+        if self.decode_buffered()[0]:
+            return
+        depth = 0
+        while True:
+            m = _JSON_STRUCT.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise self._error("Unexpected end of JSON")
+                continue
+            self.pos = m.start()
+            c = m.group()
+            if c == '"':
+                self._skip_string()
+                continue
+            self.pos += 1
+            depth += 1 if c in "{[" else -1
+            if depth == 0:
+                return
+
+    def members(self):
+        """Yield the keys of the next object; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error("Expecting property name")
+            key = self.value()
+            self.expect(":")
+            yield key
+            c = self.peek()
+            self.pos += 1
+            if c == "}":
+                return
+            if c != ",":
+                raise self._error("Expecting ',' delimiter")
+
+    def items(self):
+        """Yield once per element of the next array; the caller consumes it."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            c = self.peek()
+            self.pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise self._error("Expecting ',' delimiter")
+
+
+def _iter_json_chapters(stream: _JsonStream):
+    """Yield ("JSON_DATA", (subject_id, title, link)) per data.chapters entry."""
+    for key in stream.members():
+        if key != "data" or stream.peek() != "{":
+            stream.skip()
+            continue
+        for dkey in stream.members():
+            if dkey != "chapters" or stream.peek() != "[":
+                stream.skip()
+                continue
+            for _ in stream.items():
+                if stream.peek() != "{":
+                    stream.skip()
+                    continue
+                # Chapters are small: decode one in a single C call when it
+                # is already buffered, field by field otherwise.
+                ok, ch = stream.decode_buffered()
+                if not ok:
+                    ch = {}
+                    for ckey in stream.members():
+                        if ckey in _CHAPTER_FIELDS:
+                            ch[ckey] = stream.value()
+                        else:
+                            stream.skip()
+                yield "JSON_DATA", (
+                    ch.get("subject_id", "General"),
+                    ch.get("title", ""),
+                    ch.get("link", ""),
+                )
+
+
+# ── Format sniffing ────────────────────────────────────────────────────────
+# The reader is chosen once from a bounded sample — the first and last
+# _SNIFF_BYTES of the input — so no format costs a speculative full pass.
+
+_SNIFF_BYTES  = 8 * 1024
+_SNIFF_LINES  = 20
+_CSV_ROW_RE   = re.compile(r'^[^:]*,\s*"?[A-Za-z][\w+.-]*://')
+_CSV_URL_RE   = re.compile(r'[A-Za-z][\w+.-]*://')
+_CSV_NAME     = ("name", "title", "lecture")
+_CSV_URL      = ("url", "link")
+_EXTINF_RE    = re.compile(r'#EXTINF:[^,"]*(?:"[^"]*"[^,"]*)*,(.*)')
+_M3U_GROUP_RE = re.compile(r'group-title="([^"]*)"')
+
+
+def sniff_encoding(sample: bytes, encodings=("utf-8",), tail: bytes = None):
+    """
+    Return the first of encodings that decodes sample — and tail, a sample
+    from the end of the same input, when given — or None.
+    """
+    if sample.startswith(codecs.BOM_UTF8) and "utf-8-sig" in encodings:
+        if tail is None or _decodes_tail(tail, "utf-8-sig"):
+            return "utf-8-sig"
+    for enc in encodings:
+        try:
+            # final=False: a multi-byte sequence cut at the sample edge is fine
+            codecs.getincrementaldecoder(enc)().decode(sample)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        if tail is None or _decodes_tail(tail, enc):
+            return enc
+    return None
+
+
+def _decodes_tail(tail: bytes, encoding: str) -> bool:
+    # The tail sample can start inside a multi-byte sequence; skip up to 3 bytes.
+    for skip in range(min(4, len(tail) + 1)):
+        try:
+            codecs.decode(tail[skip:], encoding)
+            return True
+        except UnicodeDecodeError:
+            continue
+    return False
+
+
+def _csv_header(row) -> bool:
+    cells = [c.strip().lower() for c in row]
+    return any(c in _CSV_NAME for c in cells) and any(c in _CSV_URL for c in cells)
+
+
+def sniff_format(head: str, tail=None) -> str:
+    """
+    Pick a reader for the input from its head (and tail, when known):
+    "json", "m3u", "csv" or "text".
+    """
+    start = head.lstrip("\ufeff \t\r\n")
+    if start.startswith("{"):
+        if tail is None or tail.rstrip().endswith("}"):
+            return "json"
+        return "text"
+    if start.startswith("#EXTM3U") or "#EXTINF" in head:
+        return "m3u"
+    lines = head.splitlines()
+    if lines and not head.endswith(("\n", "\r")) and len(head) >= _SNIFF_BYTES:
+        lines.pop()                                    # cut-off last line
+    lines = [l for l in (l.strip() for l in lines) if l and not l.startswith("#")]
+    lines = lines[:_SNIFF_LINES]
+    if not lines:
+        return "text"
+    if "," in lines[0] and _csv_header(next(csv.reader(lines[:1]))):
+        return "csv"
+    if all(_CSV_ROW_RE.match(l) for l in lines):
+        return "csv"
+    return "text"
+
+
+def sniff_input(fp, encodings=("utf-8",)):
+    """
+    Read the head and tail sample of a seekable binary file and return
+    (format, encoding); encoding is the first of encodings that decodes
+    both samples, or None.  fp is left at offset 0.
+    """
+    head = fp.read(_SNIFF_BYTES)
+    tail = head
+    if len(head) == _SNIFF_BYTES:
+        size = fp.seek(0, os.SEEK_END)
+        fp.seek(max(size - _SNIFF_BYTES, _SNIFF_BYTES))
+        tail = fp.read()
+    fp.seek(0)
+    encoding = sniff_encoding(head, encodings, tail if tail is not head else None)
+    if encoding is None:
+        return None, None
+    return sniff_format(head.decode(encoding, "replace"), tail.decode(encoding, "replace")), encoding
+
+
+# ── Readers ────────────────────────────────────────────────────────────────
+
+def _read_text(chunks):
+    return _iter_text_pairs(_iter_lines(chunks))
+
+
+def _read_json(chunks):
+    chunks  = iter(chunks)
+    stream  = _JsonStream(chunks)
+    yielded = False
+    try:
+        for pair in _iter_json_chapters(stream):
+            yielded = True
+            yield pair
+        return
+    except UnicodeDecodeError:
+        raise                               # wrong encoding: the caller retries
+    except ValueError:
+        if yielded or stream.dropped:
+            raise
+    # Sniffed as JSON but isn't a chapters export — nothing was discarded
+    # yet, so read the buffered start plus the rest of the stream as text.
+    yield from _read_text(itertools.chain((stream.buf,), chunks))
+
+
+def _read_m3u(chunks):
+    """#EXTINF playlists; group-title becomes the subject."""
+    title = None
+    for line in _iter_lines(chunks):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            m = _EXTINF_RE.match(line)
+            if m:
+                title = m.group(1).strip()
+                g     = _M3U_GROUP_RE.search(line)
+                if g and g.group(1).strip():
+                    title = f"{g.group(1).strip()} || {title or 'Untitled'}"
+            continue
+        name  = title or line.rstrip("/").rsplit("/", 1)[-1] or line
+        title = None
+        yield name, line
+
+
+def _read_csv(chunks):
+    """
+    name,url rows; an optional header may add a subject column.  Rows that
+    are not CSV-shaped (no URL cell, or nothing but the URL) are read with
+    the text grammar, so a file that only starts out as CSV loses nothing.
+    """
+    name_i = url_i = sub_i = None
+    raw    = []
+
+    def lines():
+        for line in _iter_lines(chunks):
+            raw.append(line)
+            yield line
+
+    for row in csv.reader(lines()):
+        text  = raw[:]
+        raw.clear()
+        cells = [c.strip() for c in row]
+        if not any(cells):
+            continue
+        if name_i is None and url_i is None and _csv_header(cells):
+            low    = [c.lower() for c in cells]
+            name_i = next(i for i, c in enumerate(low) if c in _CSV_NAME)
+            url_i  = next(i for i, c in enumerate(low) if c in _CSV_URL)
+            sub_i  = low.index("subject") if "subject" in low else None
+            continue
+        if url_i is not None:
+            ok   = url_i < len(cells) and name_i < len(cells)
+            name = cells[name_i] if ok else ""
+            url  = cells[url_i] if ok else ""
+            if name and sub_i is not None and sub_i < len(cells) and cells[sub_i]:
+                name = f"({cells[sub_i]}) {name}"
+        else:
+            url  = next((c for c in cells if _CSV_URL_RE.match(c)), "")
+            name = next((c for c in cells if c and c is not url), "")
+        if name and _CSV_URL_RE.match(url):
+            yield name, url
+        else:
+            yield from _iter_text_pairs(text)
+
+
+_READERS = {
+    "text": _read_text,
+    "json": _read_json,
+    "m3u":  _read_m3u,
+    "csv":  _read_csv,
+}
+
+
+def _iter_pairs(chunks, fmt=None):
+    chunks = iter(chunks)
+    if fmt is None:
+        # No tail to look at (plain stream): sniff on the head alone.
+        head = ""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= _SNIFF_BYTES:
+                break
+        fmt    = sniff_format(head)
+        chunks = itertools.chain((head,), chunks)
+    return _READERS[fmt](chunks)
+
+
+def iter_names_and_urls(fp, encoding: str = "utf-8", chunk_size: int = _READ_CHUNK,
+                        fmt=None, errors: str = "strict"):
+    """
+    Stream (name, url) pairs from a text or binary file object.
+    The input is read in chunk_size blocks and only one partial line is
+    buffered, so memory no longer grows with the raw file size.  fmt is a
+    _READERS key (see sniff_input); None sniffs it from the first chunk.
+    """
+    return _iter_pairs(_iter_chunks(fp, encoding, chunk_size, errors), fmt)
+
+
+def extract_names_and_urls(file_content: str) -> list:
+    head = file_content[:_SNIFF_BYTES]
+    return list(_iter_pairs((file_content,), sniff_format(head, file_content[-_SNIFF_BYTES:])))
+
+
+_TOPIC_NUM_RE = re.compile(r"\s*#\d+\s*$")
 
 
 def extract_topic(title: str) -> str:
-    return re.sub(r"\s*#\d+\s*$", "", title).strip()
+    if "#" not in title:
+        return title.strip()
+    return _TOPIC_NUM_RE.sub("", title).strip()
+
+
+# ── Line grammar ───────────────────────────────────────────────────────────
+# parse_line walks this table once per name.  `guard` is a plain str test
+# that must pass before `pattern` is tried, so a bare "Name" never touches
+# the regex engine.  `build` gets the match object, or the name itself when
+# the entry has no pattern, and returns (subject, topic, title).
+
+_LineFormat = collections.namedtuple("_LineFormat", "name guard pattern build")
+
+
+def _build_paren(m):
+    subj = m.group(1).strip()
+    rest = m.group(2).strip().lstrip("||").strip()
+    return subj, extract_topic(rest), rest
+
+
+def _build_teacher(m):
+    subj  = m.group(1).strip()
+    title = m.group(2).strip()
+    return subj, extract_topic(title), title
+
+
+def _build_pipes(name):
+    subj, _, title = name.partition("||")
+    title = title.strip()
+    return subj.strip(), extract_topic(title), title
+
+
+_LINE_GRAMMAR = [
+    # (Subject) Topic #n
+    _LineFormat("paren", lambda n: n.startswith("("),
+                re.compile(r"^\((.*?)\)\s*(.+)"), _build_paren),
+    # X by Sir || Title
+    _LineFormat("teacher", lambda n: "||" in n,
+                re.compile(r"^(.*?\s+(?:by|By)\s+(?:Sir|Mam))\s*\|\|\s*(.+)"), _build_teacher),
+    # Subj || Topic #n
+    _LineFormat("pipes", lambda n: "||" in n, None, _build_pipes),
+]
+
+
+def register_line_format(name: str, pattern, build, guard=None, before: str = None) -> None:
+    """
+    Add a name format to the parse_line grammar.
+    `pattern` may be a regex string, a compiled pattern or None; `before`
+    names an existing entry to insert ahead of (default: append last).
+    """
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern)
+    entry = _LineFormat(name, guard or (lambda n: True), pattern, build)
+    if before is None:
+        _LINE_GRAMMAR.append(entry)
+        return
+    for i, fmt in enumerate(_LINE_GRAMMAR):
+        if fmt.name == before:
+            _LINE_GRAMMAR.insert(i, entry)
+            return
+    raise KeyError(before)
 
 
 def parse_line(name: str):
     if name == "JSON_DATA":
         return "JSON_DATA", None, None
-    m = re.match(r"^\((.*?)\)\s*(.+)", name)
-    if m:
-        subj = m.group(1).strip()
-        rest = m.group(2).strip().lstrip("||").strip()
-        return subj, extract_topic(rest), rest
-    m = re.match(r"^(.*?\s+(?:by|By)\s+(?:Sir|Mam))\s*\|\|\s*(.+)", name)
-    if m:
-        subj  = m.group(1).strip()
-        title = m.group(2).strip()
-        return subj, extract_topic(title), title
-    if "||" in name:
-        subj, _, title = name.partition("||")
-        return subj.strip(), extract_topic(title.strip()), title.strip()
+    for fmt in _LINE_GRAMMAR:
+        if not fmt.guard(name):
+            continue
+        if fmt.pattern is None:
+            return fmt.build(name)
+        m = fmt.pattern.match(name)
+        if m:
+            return fmt.build(m)
     return "General", None, name
 
 
-def _make_lid(subject: str, topic: str, title: str) -> str:
+def _make_lid(subject: str, topic: str, title: str, url: str = "", taken: dict = None) -> str:
+    """
+    Content-stable lecture ID: a hash of subject, topic, title and first URL,
+    so adding lines elsewhere in a batch never shifts it.  With the builder's
+    `taken` dict, exact repeats get '#2', '#3'... mixed into the hash.
+    """
+    lid = _hash_lid(subject, topic, title, url)
+    if taken is not None:
+        n = taken[lid] = taken.get(lid, 0) + 1
+        if n > 1:
+            lid = _hash_lid(subject, topic, title, url, n)
+    return lid
+
+
+def _hash_lid(subject: str, topic: str, title: str, url: str, n: int = 1) -> str:
+    raw = f"{subject}||{topic or ''}||{title}||{url}"
+    if n > 1:
+        raw = f"{raw}#{n}"
+    return "l" + hashlib.md5(raw.encode()).hexdigest()[:12]
+
+
+def _legacy_lid(subject: str, topic: str, title: str) -> str:
+    """
+    The lid older pages stored watched marks under: subject, topic and
+    title — with "__<pair index>" appended for text lines — and no URL.
+    Pages carry it as an alias (#lid-alias) so that history carries over.
+    """
     raw = f"{subject}||{topic or ''}||{title}"
     return "l" + hashlib.md5(raw.encode()).hexdigest()[:12]
 
 
-def structure_data_in_order(urls: list) -> list:
-    structured  = []
-    subject_map = {}
-    last_video  = {}
+# ── Course model ───────────────────────────────────────────────────────────
+# Compact __slots__ tree built once per conversion.  Subject/topic names are
+# interned, single-URL lectures hold 1-tuples, and lecture counts are kept
+# up to date on insert so nothing has to re-walk the tree to count.
+
+def _intern(name):
+    return sys.intern(name) if type(name) is str else name
+
+
+class Lecture:
+    # idx: position of the lecture's (name, url) pair (or JSON chapter) in
+    # the input, its watched-bit ordinal; old: its _legacy_lid.
+    __slots__ = ("title", "lid", "videos", "pdfs", "idx", "old")
+
+    def __init__(self, title: str, lid: str, videos: tuple = (), pdfs: tuple = (),
+                 idx: int = None, old: str = None):
+        self.title  = title
+        self.lid    = lid
+        self.videos = videos
+        self.pdfs   = pdfs
+        self.idx    = idx
+        self.old    = old
+
+
+class Topic:
+    __slots__ = ("name", "lectures")
 
+    def __init__(self, name: str):
+        self.name     = name
+        self.lectures = []
+
+
+class Subject:
+    __slots__ = ("name", "topics", "direct_lectures", "lecture_count")
+
+    def __init__(self, name: str):
+        self.name            = name
+        self.topics          = {}
+        self.direct_lectures = []
+        self.lecture_count   = 0
+
+    def __reduce__(self):
+        # Subjects cross process boundaries in parse_parallel; plain row
+        # tuples pickle several times faster than __slots__ objects.
+        rows = lambda lecs: [(l.title, l.lid, l.videos, l.pdfs, l.idx, l.old) for l in lecs]
+        return _unpickle_subject, (self.name, rows(self.direct_lectures),
+                                   [(t.name, rows(t.lectures)) for t in self.topics.values()])
+
+    def topic(self, name: str) -> Topic:
+        t = self.topics.get(name)
+        if t is None:
+            name = _intern(name)
+            t = self.topics[name] = Topic(name)
+        return t
+
+
+def _unpickle_subject(name: str, direct: list, topics: list) -> Subject:
+    sub = Subject(_intern(name))
+    sub.direct_lectures = [Lecture(*r) for r in direct]
+    for tname, rows in topics:
+        sub.topic(tname).lectures = [Lecture(*r) for r in rows]
+    sub.lecture_count = len(direct) + sum(len(rows) for _, rows in topics)
+    return sub
+
+
+class Course:
+    __slots__ = ("subjects", "_by_name", "lecture_count", "pairs")
+
+    def __init__(self):
+        self.subjects      = []
+        self._by_name      = {}
+        self.lecture_count = 0
+        self.pairs         = 0      # (name, url) pairs read into it
+
+    def __iter__(self):
+        return iter(self.subjects)
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __getitem__(self, i):
+        return self.subjects[i]
+
+    def subject(self, name: str) -> Subject:
+        sub = self._by_name.get(name)
+        if sub is None:
+            name = _intern(name)
+            sub  = self._by_name[name] = Subject(name)
+            self.subjects.append(sub)
+        return sub
+
+    def add(self, sub: Subject, lecture: Lecture, topic: str = None) -> None:
+        """Append lecture to a topic of sub, or to its direct list when topic is None."""
+        if topic is None:
+            sub.direct_lectures.append(lecture)
+        else:
+            sub.topic(topic).lectures.append(lecture)
+        sub.lecture_count  += 1
+        self.lecture_count += 1
+
+
+def structure_data_in_order(urls) -> Course:
+    """Build the course tree from any iterable of (name, url) pairs."""
+    return _maybe_regroup_parts(_build_course(urls, {}))
+
+
+def _build_course(urls, taken) -> Course:
+    """
+    structure_data_in_order without the final regroup.  taken=None leaves
+    repeated lids un-numbered (see _merge_courses).
+    """
+    course     = Course()
+    # subject -> topic -> title -> last video Lecture (for PDF attachment)
+    last_video = {}
+
+    idx = -1
     for idx, (name, url) in enumerate(urls):
         subject, topic, title = parse_line(name)
 
         if subject == "JSON_DATA" and name == "JSON_DATA":
-            json_data = url
-            for ch in json_data.get("data", {}).get("chapters", []):
-                subj   = ch.get("subject_id", "General")
-                ctitle = ch.get("title", "")
-                clink  = ch.get("link", "")
-                ctopic = extract_topic(ctitle)
-                lid    = _make_lid(subj, ctopic, ctitle)
-                if subj not in subject_map:
-                    obj = {"name": subj, "topics": {}}
-                    subject_map[subj] = obj
-                    structured.append(obj)
-                cur = subject_map[subj]
-                if ctopic not in cur["topics"]:
-                    cur["topics"][ctopic] = {"name": ctopic, "lectures": []}
-                cur["topics"][ctopic]["lectures"].append(
-                    {"title": ctitle, "lid": lid, "videos": [clink], "pdfs": []}
-                )
+            subj, ctitle, clink = url
+            ctopic = extract_topic(ctitle)
+            lid    = _make_lid(subj, ctopic, ctitle, clink, taken)
+            old    = _legacy_lid(subj, ctopic, ctitle)
+            course.add(course.subject(subj), Lecture(ctitle, lid, (clink,), idx=idx, old=old), ctopic)
             continue
 
         is_pdf = ".pdf" in url.lower()
-        key    = (subject, topic or "", title or name)
-        lid    = _make_lid(subject, topic or "", f"{title or name}__{idx}")
-
-        if is_pdf and key in last_video:
-            last_video[key]["pdfs"].append(url)
-            continue
-
-        lecture = {
-            "title":  title or name,
-            "lid":    lid,
-            "videos": [] if is_pdf else [url],
-            "pdfs":   [url] if is_pdf else [],
-        }
-        if not is_pdf:
-            last_video[key] = lecture
-
-        if subject not in subject_map:
-            obj = {"name": subject, "topics": {}}
-            subject_map[subject] = obj
-            structured.append(obj)
-
-        cur = subject_map[subject]
-        if topic:
-            if topic not in cur["topics"]:
-                cur["topics"][topic] = {"name": topic, "lectures": []}
-            cur["topics"][topic]["lectures"].append(lecture)
+        title  = title or name
+        seen   = last_video.setdefault(subject, {}).setdefault(topic or "", {})
+
+        if is_pdf:
+            prev = seen.get(title)
+            if prev is not None:
+                prev.pdfs += (url,)
+                continue
+            lecture = Lecture(title, _make_lid(subject, topic, title, url, taken), (), (url,))
         else:
-            cur.setdefault("direct_lectures", []).append(lecture)
+            lecture = seen[title] = Lecture(title, _make_lid(subject, topic, title, url, taken), (url,))
+        lecture.idx = idx
+        lecture.old = _legacy_lid(subject, topic, f"{title}__{idx}")
 
-    return _maybe_regroup_parts(structured)
+        course.add(course.subject(subject), lecture, topic or None)
+
+    course.pairs = idx + 1
+    return course
 
 
 _PART_PATTERN = re.compile(
@@ -144,45 +759,292 @@ _PART_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
-def _maybe_regroup_parts(structured: list) -> list:
-    if len(structured) < 3:
-        return structured
-    part_like = [s for s in structured if _PART_PATTERN.match(s["name"].strip())]
-    if len(part_like) < max(3, int(len(structured) * 0.6)):
-        return structured
-    new_sub = {"name": "All Lectures", "topics": {}}
-    for sub in structured:
-        all_lecs = list(sub.get("direct_lectures", []))
-        for t in sub.get("topics", {}).values():
-            all_lecs.extend(t["lectures"])
+def _maybe_regroup_parts(course: Course) -> Course:
+    if len(course) < 3:
+        return course
+    part_like = [s for s in course if _PART_PATTERN.match(s.name.strip())]
+    if len(part_like) < max(3, int(len(course) * 0.6)):
+        return course
+    regrouped = Course()
+    regrouped.pairs = course.pairs
+    new_sub   = regrouped.subject("All Lectures")
+    for sub in course:
+        all_lecs = list(sub.direct_lectures)
+        for t in sub.topics.values():
+            all_lecs.extend(t.lectures)
         if all_lecs:
-            new_sub["topics"][sub["name"]] = {"name": sub["name"], "lectures": all_lecs}
-    return [new_sub]
+            new_sub.topic(sub.name).lectures = all_lecs
+            new_sub.lecture_count   += len(all_lecs)
+            regrouped.lecture_count += len(all_lecs)
+    return regrouped
 
 
-def count_total_lectures(structured: list) -> int:
-    n = 0
-    for sub in structured:
-        n += len(sub.get("direct_lectures", []))
-        for t in sub.get("topics", {}).values():
-            n += len(t.get("lectures", []))
-    return n
+def count_total_lectures(course: Course) -> int:
+    return course.lecture_count
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  PARALLEL PARSE  (mega "all batches" dumps)
+# ═══════════════════════════════════════════════════════════════════════════
+# Big plain-text inputs are cut into line-aligned byte spans, each span is
+# parsed into its own Course in a worker, and _merge_courses folds them back
+# together in span order with the same result as one sequential pass.
+
+def _can_split(fmt: str, encoding: str) -> bool:
+    """Only line-per-entry text in an ASCII-compatible encoding splits on b"\\n"."""
+    return fmt == "text" and "\n".encode(encoding) == b"\n"
+
+
+def _line_spans(path: str, parts: int) -> list:
+    """Cut path into up to parts (start, end) byte spans ending on a newline."""
+    size = os.path.getsize(path)
+    cuts = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, cuts[-1]))
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > cuts[-1]:
+                cuts.append(pos)
+    cuts.append(size)
+    return list(zip(cuts, cuts[1:]))
+
+
+def _parse_span(path: str, encoding: str, start: int, end: int, errors: str = "replace") -> Course:
+    """Worker: parse one byte span into an un-merged Course."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding, errors)
+    return _build_course(_iter_text_pairs(_iter_lines((text,))), None)
+
+
+def _merge_courses(parts) -> Course:
+    """
+    Fold span Courses into one, in order.  Subjects and topics keep their
+    first-seen order, a PDF-only lecture at the start of a span attaches to
+    the last matching video of an earlier span (as it would have in one
+    pass), and lids — and the pair indexes in legacy lids — are numbered
+    against the whole course.
+    """
+    course     = Course()
+    last_video = {}
+    taken      = {}
+    for part in parts:
+        base = course.pairs
+        course.pairs += part.pairs
+        for psub in part:
+            sub    = course.subject(psub.name)
+            by_top = last_video.setdefault(sub.name, {})
+            groups = [(None, psub.direct_lectures)]
+            groups.extend((t.name, t.lectures) for t in psub.topics.values())
+            for tname, lectures in groups:
+                seen = by_top.setdefault(tname or "", {})
+                dest = sub.direct_lectures if tname is None else sub.topic(tname).lectures
+                kept = len(dest)
+                for lec in lectures:
+                    if lec.videos:
+                        seen[lec.title] = lec
+                    else:
+                        prev = seen.get(lec.title)
+                        if prev is not None:
+                            prev.pdfs += lec.pdfs
+                            continue
+                    n = taken[lec.lid] = taken.get(lec.lid, 0) + 1
+                    if n > 1:
+                        url     = (lec.videos or lec.pdfs)[0]
+                        lec.lid = _hash_lid(sub.name, tname, lec.title, url, n)
+                    if base and lec.idx is not None:
+                        lec.idx += base
+                        lec.old  = _legacy_lid(sub.name, tname, f"{lec.title}__{lec.idx}")
+                    dest.append(lec)
+                kept = len(dest) - kept
+                sub.lecture_count    += kept
+                course.lecture_count += kept
+    return _maybe_regroup_parts(course)
+
+
+def parse_parallel(path: str, encoding: str, pool, parts: int, errors: str = "replace") -> Course:
+    """structure_data_in_order for a plain-text file, parsed in pool."""
+    spans = _line_spans(path, parts)
+    if len(spans) < 2:
+        with open(path, "rb") as f:
+            return structure_data_in_order(iter_names_and_urls(f, encoding, fmt="text", errors=errors))
+    starts, ends = zip(*spans)
+    n = len(spans)
+    return _merge_courses(pool.map(_parse_span, [path] * n, [encoding] * n, starts, ends, [errors] * n))
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 #  HTML CONTENT BUILDER
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _lecture_html(lec: dict, global_index: int) -> str:
-    title  = lec["title"]
-    lid    = lec["lid"]
-    videos = lec["videos"]
-    pdfs   = lec["pdfs"]
+# Rendered lecture markup is cached across conversions in this process.
+# Entries are keyed by the lecture's own fields only and stored split at
+# two slots: the global index and each direct video's data-u/data-url
+# attribute.  The URL book differs per page, so it is applied on fill and
+# a lecture that merely moved (or changed page) is still a cache hit.
+_FRAGMENT_CACHE_SIZE = 20000
+_GIDX     = "\x00"
+_URL_SLOT = "\x01"
+_MARK_RE  = re.compile("([\x00\x01])")
+
+
+# ── URL dictionary ─────────────────────────────────────────────────────────
+# Video URLs in one batch mostly share a CDN/path root and a file/query
+# tail.  _build_url_book picks those per page, and each player link then
+# carries data-u="p,s:rest" (prefix #p + rest + suffix #s; either index may
+# be empty) instead of the full data-url.  The page expands it in _expandUrl.
+
+_URL_REF_COST = 3          # "p,s:" overhead a dictionary hit roughly costs
+
+
+class _UrlBook:
+    __slots__ = ("prefixes", "suffixes", "_p", "_s")
+
+    def __init__(self, prefixes: tuple = (), suffixes: tuple = ()):
+        self.prefixes = prefixes
+        self.suffixes = suffixes
+        self._p       = {p: str(i) for i, p in enumerate(prefixes)}
+        self._s       = {s: str(i) for i, s in enumerate(suffixes)}
+
+    def __reduce__(self):
+        return _UrlBook, (self.prefixes, self.suffixes)
+
+    def __bool__(self):
+        return bool(self._p or self._s)
+
+    def _match(self, url: str):
+        """(prefix, suffix) from the book that fit url, longest first; None if absent."""
+        pre = suf = None
+        for cand in _url_prefixes(url):
+            if cand in self._p:
+                pre = cand
+                break
+        for cand in _url_suffixes(url):
+            if cand in self._s and len(cand) + len(pre or "") <= len(url):
+                suf = cand
+                break
+        return pre, suf
+
+    def encode(self, url: str) -> str:
+        """Short data-u reference for url, or "" to keep a plain data-url."""
+        if not self:
+            return ""
+        pre, suf = self._match(url)
+        if pre is None and suf is None:
+            return ""
+        rest = url[len(pre or ""):len(url) - len(suf or "")]
+        return f'{self._p.get(pre, "")}{"," + self._s[suf] if suf else ""}:{rest}'
+
+    def script(self) -> str:
+        """The dictionary as an inert JSON <script> for the page runtime."""
+        data = json.dumps({"p": self.prefixes, "s": self.suffixes}, ensure_ascii=False)
+        data = data.replace("</", "<\\/")
+        return f'<script type="application/json" id="url-book">{data}</script>'
+
+
+def _url_prefixes(url: str):
+    """Candidate prefixes of url ending in '/', longest first (scheme excluded)."""
+    start = url.find("://")
+    start = start + 3 if start >= 0 else 0
+    end   = url.find("?")
+    end   = len(url) if end < 0 else end
+    i     = url.rfind("/", start, end)
+    while i >= start:
+        yield url[:i + 1]
+        i = url.rfind("/", start, i)
+
+
+def _url_suffixes(url: str):
+    """Candidate suffixes: from the last path '/' and from the query '?'."""
+    q = url.find("?")
+    s = url.rfind("/", 0, len(url) if q < 0 else q)
+    if s > url.find("://") + 2:
+        yield url[s:]
+    if q >= 0:
+        yield url[q:]
+
+
+def _build_url_book(course: Course) -> _UrlBook:
+    """Choose the prefixes/suffixes worth a dictionary entry for this page."""
+    pcount, scount = collections.Counter(), collections.Counter()
+    urls = []
+    for sub in course:
+        for lecs in itertools.chain((sub.direct_lectures,), (t.lectures for t in sub.topics.values())):
+            for lec in lecs:
+                for url in lec.videos:
+                    if _get_youtube_id(url) is None:
+                        urls.append(url)
+                        pcount.update(_url_prefixes(url))
+                        scount.update(_url_suffixes(url))
+
+    def worth(counter):
+        # An entry pays for itself once its repeats outweigh storing it once.
+        return {k for k, n in counter.items() if n > 1 and n * (len(k) - _URL_REF_COST) > len(k) + 4}
+
+    trial = _UrlBook(tuple(worth(pcount)), tuple(worth(scount)))
+    used_p, used_s = collections.Counter(), collections.Counter()
+    for url in urls:
+        pre, suf = trial._match(url)
+        if pre is not None:
+            used_p[pre] += 1
+        if suf is not None:
+            used_s[suf] += 1
+    # Most-used entries first, so the common references get one-digit indices.
+    return _UrlBook(tuple(k for k, n in used_p.most_common() if n > 1),
+                    tuple(k for k, n in used_s.most_common() if n > 1))
+
+
+def _without_marker(title: str, videos: tuple, pdfs: tuple) -> tuple:
+    if any(c in title or any(c in u for u in videos + pdfs) for c in (_GIDX, _URL_SLOT)):
+        # NUL/SOH are the slot markers; browsers turn them into U+FFFD anyway.
+        fix = lambda s: _MARK_RE.sub("\ufffd", s)
+        return fix(title), tuple(map(fix, videos)), tuple(map(fix, pdfs))
+    return title, videos, pdfs
+
+
+def _split_fragment(markup: str, videos: tuple) -> tuple:
+    """(parts, urls): markup split at the slots, kept in order, plus the
+    direct (non-YouTube) video URLs that fill the _URL_SLOT ones."""
+    urls = tuple(u for u in videos if _get_youtube_id(u) is None)
+    return tuple(_MARK_RE.split(markup)), urls
+
+
+def _fill_fragment(fragment: tuple, global_index: int, book: _UrlBook) -> str:
+    parts, urls = fragment
+    gi   = str(global_index)
+    nxt  = iter(urls).__next__
+    out  = []
+    for p in parts:
+        if p == _GIDX:
+            out.append(gi)
+        elif p == _URL_SLOT:
+            url = nxt()
+            ref = book.encode(url) if book else ""
+            out.append(f'data-u="{html.escape(ref, quote=True)}"' if ref
+                       else f'data-url="{html.escape(url, quote=True)}"')
+        else:
+            out.append(p)
+    return "".join(out)
+
+
+def _lecture_html(lec: Lecture, global_index: int, book: _UrlBook) -> str:
+    return _fill_fragment(_lecture_fragment(lec.lid, lec.title, lec.videos, lec.pdfs), global_index, book)
+
+
+@functools.lru_cache(maxsize=_FRAGMENT_CACHE_SIZE)
+def _lecture_fragment(lid: str, title: str, videos: tuple, pdfs: tuple) -> tuple:
+    """Lecture markup with the global index and direct-video URL attributes
+    left as slots; see _fill_fragment."""
+    global_index = _GIDX
+    title, videos, pdfs = _without_marker(title, videos, pdfs)
     et     = html.escape(title)
     eta    = html.escape(title, quote=True)
     multi  = len(videos) > 1
 
-    video_links = ""
+    video_links = []
     for i, vurl in enumerate(videos, 1):
         yt_id    = _get_youtube_id(vurl)
         is_yt    = yt_id is not None
@@ -197,22 +1059,20 @@ def _lecture_html(lec: dict, global_index: int) -> str:
             data_part = f'data-yt="{html.escape(yt_id, quote=True)}"'
             aria_lbl  = f"Watch on YouTube: {eta}"
         else:
-            data_part = f'data-url="{html.escape(vurl, quote=True)}"'
+            data_part = _URL_SLOT
             aria_lbl  = f"Play {eta}{(' part ' + str(i)) if multi else ''}"
-        video_links += (
+        video_links.append(
             f'<a href="#" class="list-item video-item{extra_cls}" role="button" tabindex="0"'
             f' {data_part} data-lid="{lid}" data-title="{eta}"'
             f' data-gidx="{global_index}"'
-            f' aria-label="{html.escape(aria_lbl, quote=True)}"'
-            f' onclick="playVideo(event,this)"'
-            f' onkeydown="if(event.key===\'Enter\'||event.key===\' \'){{event.preventDefault();playVideo(event,this);}}">'
+            f' aria-label="{html.escape(aria_lbl, quote=True)}">'
             f'{label}</a>'
         )
 
-    pdf_links = ""
+    pdf_links = []
     for purl in pdfs:
         eu = html.escape(purl, quote=True)
-        pdf_links += (
+        pdf_links.append(
             f'<a href="{eu}" target="_blank" rel="noopener noreferrer"'
             f' class="list-item pdf-item" aria-label="Open PDF for {eta}">'
             f'<i class="fa-solid fa-file-pdf" aria-hidden="true"></i>&nbsp;PDF</a>'
@@ -220,79 +1080,270 @@ def _lecture_html(lec: dict, global_index: int) -> str:
 
     watch_btn = (
         f'<button class="watch-btn" data-lid="{lid}"'
-        f' onclick="toggleWatched(\'{lid}\')"'
         f' aria-label="Mark as watched" aria-pressed="false"'
         f' title="Mark watched">&#9675;</button>'
     )
 
     copy_btn = (
         f'<button class="copy-btn" data-lid="{lid}"'
-        f' onclick="copyLectureLink(\'{lid}\')"'
         f' aria-label="Copy link" title="Copy link">'
         f'<i class="fa-solid fa-link" aria-hidden="true"></i></button>'
     ) if videos else ""
 
-    return (
+    return _split_fragment(
         f'<div class="lecture-entry" data-lid="{lid}" data-gidx="{global_index}">'
         f'<div class="lecture-meta">'
         f'{watch_btn}'
         f'<p class="lecture-title" data-title="{eta}">{et}</p>'
         f'{copy_btn}'
         f'</div>'
-        f'<div class="lecture-links">{video_links}{pdf_links}</div>'
-        f'</div>'
+        f'<div class="lecture-links">{"".join(video_links)}{"".join(pdf_links)}</div>'
+        f'</div>',
+        videos,
     )
 
 
-def _build_content_html(structured: list) -> str:
+def _iter_content_html(structured: Course, book: _UrlBook = None, profile: str = "full"):
+    """Yield the course markup one lecture / header fragment at a time."""
     if not structured:
-        return "<p class='empty-msg'>No content found.</p>"
-    parts       = []
-    global_idx  = 0
-
+        yield "<p class='empty-msg'>No content found.</p>"
+        return
+    if book is None:
+        book = _build_url_book(structured)
+    subject_html = _SUBJECT_HTML[profile]
+    global_idx   = 0
+    yield from _content_head(structured, book, profile)
+    for n, sub in enumerate(structured):
+        yield from subject_html(sub, n, global_idx, book)
+        global_idx += sub.lecture_count
+    yield _CONTENT_WRAP.get(profile, ("", ""))[1]
+
+
+def _content_head(structured: Course, book: _UrlBook, profile: str) -> list:
+    """What goes in front of the subjects: lid aliases, ordinals, url book, index, opening wrap."""
+    head = [_lid_aliases(structured), _lecture_ords(structured)]
+    if book:
+        head.append(book.script())
+    if profile == "full":
+        head.append(_course_index(structured))
+        head.append(_search_index(structured))
+    head.append(_CONTENT_WRAP.get(profile, ("", ""))[0])
+    return head
+
+
+def _lid_aliases(structured: Course) -> str:
+    """
+    #lid-alias: per lecture on this page, in gidx order, 8 hex digits of its
+    _legacy_lid, so watched marks stored under the old lids fold into the
+    current ones (see loadWatched).  One string keeps it to 8 bytes a row.
+    """
+    tags = []
     for sub in structured:
-        sname  = sub["name"]
-        direct = sub.get("direct_lectures", [])
-        topics = sub.get("topics", {})
-        total  = len(direct) + sum(len(t["lectures"]) for t in topics.values())
-
-        inner = ""
-        for lec in direct:
-            inner += _lecture_html(lec, global_idx)
-            global_idx += 1
+        for lecs in itertools.chain((sub.direct_lectures,), (t.lectures for t in sub.topics.values())):
+            tags.extend((lec.old or "l--------")[1:9] for lec in lecs)
+    return f'<script type="application/json" id="lid-alias">"{"".join(tags)}"</script>'
+
+
+def _lecture_ords(structured: Course) -> str:
+    """
+    #lecture-ord: per lecture on this page, in gidx order, its pair index
+    in the input as the step from the previous one — the ordinal its
+    watched bit is stored under (see the WATCHED STORE runtime).
+    """
+    ords, prev = [], 0
+    for sub in structured:
+        for lecs in itertools.chain((sub.direct_lectures,), (t.lectures for t in sub.topics.values())):
+            for lec in lecs:
+                ords.append(lec.idx - prev)
+                prev = lec.idx
+    return f'<script type="application/json" id="lecture-ord">{_json_text(ords)}</script>'
+
+
+def _json_text(data) -> str:
+    # "<" inside a script element can end it or open a comment; JSON takes <.
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+
+
+def _course_index(structured: Course) -> str:
+    """
+    #course-index for server-rendered pages: the #course-data layout with
+    rows cut down to [lid] ([lid, 0] for a lecture with no video), so the
+    runtime can find a lecture's subject, topic, body and the next playable
+    one from its lid or gidx without scanning the DOM.
+    """
+    rows = lambda lecs: [[lec.lid] if lec.videos else [lec.lid, 0] for lec in lecs]
+    data = [[sub.name, rows(sub.direct_lectures), [[t.name, rows(t.lectures)] for t in sub.topics.values()]]
+            for sub in structured]
+    return f'<script type="application/json" id="course-index">{_json_text(data)}</script>'
+
+
+def _search_index(structured: Course) -> str:
+    """
+    #search-index: every title lowercased, in gidx order, joined by "\n"
+    into one string.  Search is a single indexOf() walk over it instead of
+    reading titles back out of the DOM and <template>s.
+    """
+    titles = []
+    for sub in structured:
+        for lecs in itertools.chain((sub.direct_lectures,), (t.lectures for t in sub.topics.values())):
+            titles.extend(lec.title.replace("\n", " ").lower() for lec in lecs)
+    text = "\n".join(titles)
+    return f'<script type="application/json" id="search-index">{_json_text(text)}</script>'
+
+
+def _iter_subject_html(sub: Subject, n: int, global_idx: int, book: _UrlBook):
+    """
+    Markup of the n-th subject, whose first lecture is global_idx.  Subject
+    and topic bodies are inert <template>s until the page stamps them in.
+    """
+    sname = sub.name
+    total = sub.lecture_count
+    if n:
+        yield "\n"
+    yield (
+        f'<div class="accordion-item" data-k="{n}">'
+        f'<button class="accordion-header" aria-expanded="false"'
+        f' aria-controls="ac-{html.escape(sname,quote=True)}">'
+        f'<span class="sub-name">{html.escape(sname)}</span>'
+        f'<span class="sub-count" aria-label="{total} lectures">{total}</span>'
+        f'<span class="sub-progress" aria-live="polite"></span>'
+        f'<span class="acc-arrow" aria-hidden="true">&#43;</span>'
+        f'</button>'
+        f'<div class="accordion-content" id="ac-{html.escape(sname,quote=True)}" data-lazy><template>'
+    )
 
-        for tname, tdata in topics.items():
-            lec_html = ""
-            for lec in tdata["lectures"]:
-                lec_html += _lecture_html(lec, global_idx)
-                global_idx += 1
-            tc = len(tdata["lectures"])
-            inner += (
-                f'<div class="topic-accordion">'
-                f'<button class="topic-header" aria-expanded="false"'
-                f' aria-controls="tc-{html.escape(tname,quote=True)}">'
-                f'<i class="fa-solid fa-folder" aria-hidden="true"></i>'
-                f'<span class="topic-name">{html.escape(tname)}</span>'
-                f'<span class="topic-count" aria-label="{tc} lectures">{tc}</span>'
-                f'<span class="topic-progress" aria-live="polite"></span>'
-                f'</button>'
-                f'<div class="topic-content" id="tc-{html.escape(tname,quote=True)}">{lec_html}</div>'
-                f'</div>'
-            )
-
-        parts.append(
-            f'<div class="accordion-item">'
-            f'<button class="accordion-header" aria-expanded="false"'
-            f' aria-controls="ac-{html.escape(sname,quote=True)}">'
-            f'<span class="sub-name">{html.escape(sname)}</span>'
-            f'<span class="sub-count" aria-label="{total} lectures">{total}</span>'
-            f'<span class="sub-progress" aria-live="polite"></span>'
-            f'<span class="acc-arrow" aria-hidden="true">&#43;</span>'
+    for lec in sub.direct_lectures:
+        yield _lecture_html(lec, global_idx, book)
+        global_idx += 1
+
+    for t, (tname, tdata) in enumerate(sub.topics.items()):
+        tc = len(tdata.lectures)
+        yield (
+            f'<div class="topic-accordion" data-k="{n}.{t}">'
+            f'<button class="topic-header" aria-expanded="false"'
+            f' aria-controls="tc-{html.escape(tname,quote=True)}">'
+            f'<i class="fa-solid fa-folder" aria-hidden="true"></i>'
+            f'<span class="topic-name">{html.escape(tname)}</span>'
+            f'<span class="topic-count" aria-label="{tc} lectures">{tc}</span>'
+            f'<span class="topic-progress" aria-live="polite"></span>'
             f'</button>'
-            f'<div class="accordion-content" id="ac-{html.escape(sname,quote=True)}">{inner}</div>'
-            f'</div>'
+            f'<div class="topic-content" id="tc-{html.escape(tname,quote=True)}" data-lazy><template>'
         )
-    return "\n".join(parts)
+        for lec in tdata.lectures:
+            yield _lecture_html(lec, global_idx, book)
+            global_idx += 1
+        yield '</template></div></div>'
+
+    yield '</template></div></div>'
+
+
+# ── Lite profile markup ────────────────────────────────────────────────────
+# <details>/<ol> rows with no inline handlers; _LITE_JS drives them.
+
+def _lite_lecture_html(lec: Lecture, global_index: int, book: _UrlBook) -> str:
+    return _fill_fragment(_lite_lecture_fragment(lec.lid, lec.title, lec.videos, lec.pdfs), global_index, book)
+
+
+@functools.lru_cache(maxsize=_FRAGMENT_CACHE_SIZE)
+def _lite_lecture_fragment(lid: str, title: str, videos: tuple, pdfs: tuple) -> tuple:
+    title, videos, pdfs = _without_marker(title, videos, pdfs)
+    multi = len(videos) > 1
+    links = []
+    for i, vurl in enumerate(videos, 1):
+        yt_id = _get_youtube_id(vurl)
+        label = f"&#9654;{i}" if multi else "&#9654;"
+        if yt_id is not None:
+            data = f'data-yt="{html.escape(yt_id, quote=True)}"'
+            label += " YT"
+        else:
+            data = _URL_SLOT
+        links.append(f'<a class="p" href="#" {data}>{label}</a>')
+    for purl in pdfs:
+        links.append(f'<a class="f" href="{html.escape(purl, quote=True)}" target="_blank" rel="noopener">PDF</a>')
+    return _split_fragment(
+        f'<li class="l" data-lid="{lid}" data-gidx="{_GIDX}">'
+        f'<button class="w" aria-label="Mark watched">&#9675;</button>'
+        f'<span class="lt">{html.escape(title)}</span>{"".join(links)}</li>',
+        videos,
+    )
+
+
+def _iter_lite_subject_html(sub: Subject, n: int, global_idx: int, book: _UrlBook):
+    if n:
+        yield "\n"
+    yield f'<details class="s"><summary>{html.escape(sub.name)}<b>{sub.lecture_count}</b></summary>'
+    if sub.direct_lectures:
+        yield '<ol>'
+        for lec in sub.direct_lectures:
+            yield _lite_lecture_html(lec, global_idx, book)
+            global_idx += 1
+        yield '</ol>'
+    for tname, tdata in sub.topics.items():
+        yield f'<details><summary>{html.escape(tname)}<b>{len(tdata.lectures)}</b></summary><ol>'
+        for lec in tdata.lectures:
+            yield _lite_lecture_html(lec, global_idx, book)
+            global_idx += 1
+        yield '</ol></details>'
+    yield '</details>'
+
+
+# ── Island profile (client-rendered) ───────────────────────────────────────
+# Same page and runtime as "full", but the course ships once as compact JSON
+# in #course-data — [[subject, rows, [[topic, rows], ...]], ...] with rows of
+# [lid, title, videos(, pdfs)] — and _JS_BODY builds a subject's or topic's
+# DOM only when it is opened.  A video is its _UrlBook reference, "~" + the
+# YouTube id, or the URL itself ("=" + URL where it could pass for either).
+
+_ISLAND_ESCAPE_RE = re.compile(r"[~=]|\d*(?:,\d+)?:")
+
+
+def _island_video(url: str, ref: str) -> str:
+    yt_id = _get_youtube_id(url)
+    if yt_id is not None:
+        return "~" + yt_id
+    if ref:
+        return ref
+    return "=" + url if _ISLAND_ESCAPE_RE.match(url) else url
+
+
+def _island_rows(lectures: list, book: _UrlBook) -> list:
+    rows = []
+    for lec in lectures:
+        videos = [_island_video(u, book.encode(u) if book else "") for u in lec.videos]
+        rows.append([lec.lid, lec.title, videos, list(lec.pdfs)] if lec.pdfs
+                    else [lec.lid, lec.title, videos])
+    return rows
+
+
+def _iter_island_subject_html(sub: Subject, n: int, global_idx: int, book: _UrlBook):
+    """The n-th subject's entry in the #course-data array (gidx is implied by order)."""
+    row  = [sub.name, _island_rows(sub.direct_lectures, book),
+            [[tname, _island_rows(t.lectures, book)] for tname, t in sub.topics.items()]]
+    data = _json_text(row)
+    yield ",\n" + data if n else data
+
+
+# profile -> per-subject markup generator
+_SUBJECT_HTML = {
+    "full":   _iter_subject_html,
+    "lite":   _iter_lite_subject_html,
+    "island": _iter_island_subject_html,
+}
+
+# profile -> (opening, closing) markup around the subjects
+_CONTENT_WRAP = {
+    "island": ('<script type="application/json" id="course-data">[', "]</script>"),
+}
+
+
+def _render_subject(sub: Subject, n: int, global_idx: int, book: _UrlBook,
+                    profile: str = "full") -> bytes:
+    """Worker: one subject's markup, encoded."""
+    return "".join(_SUBJECT_HTML[profile](sub, n, global_idx, book)).encode("utf-8")
+
+
+def _build_content_html(structured: Course) -> str:
+    return "".join(_iter_content_html(structured))
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -608,8 +1659,13 @@ html.dark .topic-header.active{background:#0369a1;}
   padding:11px 0;border-bottom:1px solid var(--border);
   border-left:3px solid transparent;padding-left:6px;
   transition:border-color .2s,background .2s;
+  content-visibility:auto;contain-intrinsic-size:auto 88px;
 }
 .lecture-entry:last-child{border-bottom:none;}
+/* long lists: windowed blocks of rows (see VIRTUAL LISTS in the JS) */
+.vblock{contain:layout style;}
+.vblock > .lecture-entry:last-child{border-bottom:1px solid var(--border);}
+.vblock:last-child > .lecture-entry:last-child{border-bottom:none;}
 .lecture-entry.watched{border-left-color:var(--green);}
 .lecture-entry.now-active{
   border-left-color:var(--accent2);
@@ -642,6 +1698,9 @@ html.dark .topic-header.active{background:#0369a1;}
   text-decoration-color:var(--green);
 }
 .lecture-links{display:flex;flex-wrap:wrap;gap:7px;}
+#content-container.searching .accordion-item:not(.hit),
+#content-container.searching .topic-accordion:not(.hit),
+#content-container.searching .lecture-entry:not(.hit){display:none;}
 mark{background:#fef3c7;color:#92400e;border-radius:3px;padding:0 2px;}
 html.dark mark{background:#451a03;color:#fbbf24;}
 
@@ -692,6 +1751,11 @@ html.dark .yt-item:hover,html.dark .yt-item.playing{background:#cc0000;color:#ff
 
 /* ── Empty state ── */
 .empty-msg{text-align:center;padding:48px;color:var(--muted);font-size:15px;}
+.page-back{
+  display:inline-block;margin-bottom:10px;font-size:13px;font-weight:600;
+  color:var(--accent);text-decoration:none;
+}
+.page-back:hover{text-decoration:underline;}
 
 /* ── Footer ── */
 .footer-wrap{
@@ -967,6 +2031,110 @@ _DRAWER_JS = r"""
 #  JAVASCRIPT
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Watched-state storage, shared by the full/island runtime and _LITE_JS.
+_WATCHED_JS = r"""
+/* ═══════════════════════════════════
+   WATCHED STORE
+═══════════════════════════════════ */
+/* FILE_KEY + '_wb' holds {b, t}: b a base64 bitset over lecture ordinals
+   (the position of the lecture's line in the source file, listed for this
+   page's lectures in #lecture-ord) and t, for each set bit in bit order,
+   8 hex digits of the watched lecture's lid.  Appending lines moves no
+   ordinal; after an insert or a removal a bit's tag no longer matches the
+   lecture at its ordinal and the mark follows the tag instead.  Split
+   pages share the record and keep the bits of lectures they don't show; a
+   page holding the whole course drops bits that match none of its
+   lectures, so the record grows with the watched lectures, not the
+   course.  Pages from before the bitset kept a lid list in
+   FILE_KEY + '_w'; _wFold() matches it, also through the legacy lids in
+   #lid-alias, and its callback trims it once the bitset is stored. */
+var _wOrd = null;
+
+/* This page's ordinals, in page order (one per lid). */
+function _wOrds() {
+  var el, at = 0;
+  if (!_wOrd && (el = document.getElementById('lecture-ord'))) {
+    _wOrd = JSON.parse(el.textContent).map(function (d) { return at += d; });
+  }
+  return _wOrd || [];
+}
+/* The stored record as Map(ordinal -> lid tag). */
+function _wBits() {
+  var r = null, s = '', m = new Map(), k = 0;
+  try { r = JSON.parse(localStorage.getItem(FILE_KEY + '_wb')); } catch (e) {}
+  if (!r || typeof r.b !== 'string' || typeof r.t !== 'string') return m;
+  try { s = atob(r.b); } catch (e) {}
+  for (var i = 0; i < s.length * 8; i++) {
+    if (s.charCodeAt(i >> 3) & (1 << (i & 7))) m.set(i, r.t.substr(8 * k++, 8));
+  }
+  return m;
+}
+function _wTag(lid) { return lid.substr(1, 8); }
+/* The lids (of this page) the stored record marks watched. */
+function _wRead(lids) {
+  var ords = _wOrds(), at = new Map(), byTag = new Map(), out = new Set();
+  lids.forEach(function (lid, k) {
+    var t = _wTag(lid);
+    at.set(ords[k], lid);
+    byTag.set(t, byTag.has(t) ? null : lid);      /* null: tag not unique here */
+  });
+  _wBits().forEach(function (tag, i) {
+    var lid = at.get(i);
+    if (lid === undefined || _wTag(lid) !== tag) lid = byTag.get(tag);
+    if (lid) out.add(lid);
+  });
+  return out;
+}
+/* The record with this page's lectures set from watched.  whole: the page
+   holds the whole course, so marks it can't place are dropped. */
+function _wEncode(lids, watched, whole) {
+  var ords = _wOrds(), mine = new Map(), tags = new Set(), keep = new Map(), b = [], t = '', s = '';
+  lids.forEach(function (lid, k) { mine.set(ords[k], lid); tags.add(_wTag(lid)); });
+  if (!whole) {
+    _wBits().forEach(function (tag, i) {
+      var lid = mine.get(i);
+      if (!tags.has(tag) && !(lid && watched.has(lid))) keep.set(i, tag);   /* another page's */
+    });
+  }
+  lids.forEach(function (lid, k) { if (watched.has(lid)) keep.set(ords[k], _wTag(lid)); });
+  Array.from(keep.keys()).sort(function (x, y) { return x - y; }).forEach(function (i) {
+    while (b.length <= i >> 3) b.push(0);
+    b[i >> 3] |= 1 << (i & 7);
+    t += keep.get(i);
+  });
+  b.forEach(function (c) { s += String.fromCharCode(c); });
+  return { b: btoa(s), t: t };
+}
+/* Adds the lids that FILE_KEY + '_w' lists (directly, or as the legacy lid
+   in #lid-alias, one 8-hex tag per lid in page order) to watched.  Returns
+   null when nothing matched, else a callback that drops the matched
+   entries from _w — call it only after the bitset has been written. */
+function _wFold(lids, watched) {
+  var old = null, el, tags, had, byTag = new Map(), hit = new Set();
+  try { old = JSON.parse(localStorage.getItem(FILE_KEY + '_w')); } catch (e) {}
+  if (!Array.isArray(old)) return null;
+  el   = document.getElementById('lid-alias');
+  tags = el ? JSON.parse(el.textContent) : '';
+  had  = new Set(old);
+  old.forEach(function (lid) { byTag.set(String(lid).slice(1, 9), lid); });
+  lids.forEach(function (lid, k) {
+    var was = had.has(lid) ? lid : byTag.get(tags.substr(k * 8, 8));
+    if (was === undefined) return;
+    watched.add(lid);
+    hit.add(was);
+  });
+  if (!hit.size) return null;
+  return function () {
+    var rest = old.filter(function (lid) { return !hit.has(lid); });
+    try {
+      if (rest.length) localStorage.setItem(FILE_KEY + '_w', JSON.stringify(rest));
+      else localStorage.removeItem(FILE_KEY + '_w');
+    } catch (e) {}
+  };
+}
+"""
+
+
 _JS_BODY = r"""
 /* ═══════════════════════════════════
    STATE
@@ -981,7 +2149,6 @@ var currentGIdx     = -1;
 var currentlyPlayingBtn = null;
 var autoMarked      = new Set();
 var watchedSet      = new Set();
-var lastSaveTime    = 0;
 var autoNextTimer   = null;
 var autoNextTarget  = null;
 var lastErrorUrl    = null;
@@ -1010,8 +2177,21 @@ function showToast(msg, type, duration) {
 /* ═══════════════════════════════════
    WATCHED TRACKING
 ═══════════════════════════════════ */
+/* Stored through the WATCHED STORE helpers (_WATCHED_JS) as a bitset over
+   lecture ordinals, so appending lectures never moves a mark and split
+   pages share one record. */
+function _pageLids() {
+  var c = _course();
+  return c ? Array.from(c.gx.keys()) : [];
+}
 function loadWatched() {
-  try { watchedSet = new Set(JSON.parse(localStorage.getItem(FILE_KEY + '_w') || '[]')); } catch (e) {}
+  var lids = _pageLids();
+  watchedSet = _wRead(lids);
+  var done = _wFold(lids, watchedSet);
+  if (done) {
+    _persistWatched();
+    if (_flush()) done();
+  }
   updateWatchedUI();
 }
 function toggleWatched(lid) {
@@ -1024,48 +2204,94 @@ function toggleWatched(lid) {
     showToast('Marked as watched ✓', 'success');
   }
   _persistWatched();
-  updateWatchedUI();
+  _watchedChanged(lid, !wasWatched);
 }
 function markWatched(lid) {
   if (!lid || watchedSet.has(lid)) return;
   watchedSet.add(lid);
   _persistWatched();
-  updateWatchedUI();
+  _watchedChanged(lid, true);
   showToast('Auto-marked as watched ✓', 'success');
 }
 function _persistWatched() {
-  try { localStorage.setItem(FILE_KEY + '_w', JSON.stringify([...watchedSet])); } catch (e) {}
+  if (!_course()) return;
+  _save('_wb', function () { return _wEncode(_pageLids(), watchedSet, !_pageNav()); });
 }
 
-function updateWatchedUI() {
-  var total = 0, watched = 0;
-  document.querySelectorAll('.lecture-entry[data-lid]').forEach(function (entry) {
-    var lid = entry.dataset.lid;
-    var w   = watchedSet.has(lid);
-    entry.classList.toggle('watched', w);
-    var wb = entry.querySelector('.watch-btn');
-    if (wb) {
-      wb.innerHTML = w ? '&#10003;' : '&#9675;';
-      wb.setAttribute('aria-pressed', w ? 'true' : 'false');
-    }
-    total++;
-    if (w) watched++;
-  });
+function _paintEntry(entry) {
+  var w  = watchedSet.has(entry.dataset.lid);
+  var wb = entry.querySelector('.watch-btn');
+  entry.classList.toggle('watched', w);
+  if (wb) {
+    wb.innerHTML = w ? '&#10003;' : '&#9675;';
+    wb.setAttribute('aria-pressed', w ? 'true' : 'false');
+  }
+}
 
-  document.querySelectorAll('.accordion-item').forEach(function (sub) {
-    var lecs = sub.querySelectorAll('.lecture-entry[data-lid]');
-    var wc   = [...lecs].filter(function (l) { return watchedSet.has(l.dataset.lid); }).length;
-    var sp   = sub.querySelector('.sub-progress');
-    if (sp) sp.textContent = lecs.length ? wc + '/' + lecs.length : '';
-
-    sub.querySelectorAll('.topic-accordion').forEach(function (t) {
-      var tl = t.querySelectorAll('.lecture-entry[data-lid]');
-      var tw = [...tl].filter(function (l) { return watchedSet.has(l.dataset.lid); }).length;
-      var tp = t.querySelector('.topic-progress');
-      if (tp) tp.textContent = tl.length ? tw + '/' + tl.length : '';
-    });
-  });
+/* ═══════════════════════════════════
+   PROGRESS COUNTERS
+═══════════════════════════════════ */
+/* Watched counts per subject / topic, kept in step with watchedSet through
+   the lid -> [subject, topic] index, so a toggle touches one entry, two
+   labels and the bar.  Topic -1 = a subject's direct lectures. */
+var _lidPos = new Map();
+var _prog   = { s: [], t: [], w: 0 };
+var _labels = {};
 
+function updateWatchedUI() {
+  var c = _course();
+  _lidPos = new Map();
+  _prog   = { s: [], t: [], w: 0 };
+  if (c) {
+    c.s.forEach(function (sub, s) {
+      _prog.s.push(0);
+      _prog.t.push(sub[2].map(function () { return 0; }));
+      sub[1].forEach(function (r) { _lidPos.set(r[0], [s, -1]); });
+      sub[2].forEach(function (t, i) {
+        t[1].forEach(function (r) { _lidPos.set(r[0], [s, i]); });
+      });
+    });
+  }
+  watchedSet.forEach(function (lid) { _count(lid, 1); });
+  _entries.forEach(_paintEntry);
+  _prog.s.forEach(function (n, s) { _paintSubject(s); });
+  _paintBar();
+}
+function _count(lid, d) {
+  var p = _lidPos.get(lid);
+  if (!p) return null;                    /* another split page's lecture */
+  _prog.s[p[0]] += d;
+  if (p[1] >= 0) _prog.t[p[0]][p[1]] += d;
+  _prog.w += d;
+  return p;
+}
+function _watchedChanged(lid, on) {
+  var p     = _count(lid, on ? 1 : -1);
+  var entry = _course() && _entries.get(_course().gx.get(lid));
+  if (entry) _paintEntry(entry);
+  if (p) {
+    _paintLabel(p[0] + '', _prog.s[p[0]], _course().sn[p[0]]);
+    if (p[1] >= 0) _paintLabel(p[0] + '.' + p[1], _prog.t[p[0]][p[1]], _course().s[p[0]][2][p[1]][1].length);
+  }
+  _paintBar();
+}
+/* Subject label plus the labels of its topics that are in the DOM */
+function _paintSubject(s) {
+  var sub = _course().s[s];
+  _paintLabel(s + '', _prog.s[s], _course().sn[s]);
+  sub[2].forEach(function (t, i) { _paintLabel(s + '.' + i, _prog.t[s][i], t[1].length); });
+}
+function _paintLabel(k, w, n) {
+  var el = _labels[k];
+  if (!el) {
+    el = document.querySelector('[data-k="' + k + '"] > button .sub-progress, [data-k="' + k + '"] > button .topic-progress');
+    if (!el) return;                      /* topic still inside a lazy body */
+    _labels[k] = el;
+  }
+  el.textContent = n ? w + '/' + n : '';
+}
+function _paintBar() {
+  var watched = _prog.w, total = _lectureTotal();
   var pb   = document.getElementById('progress-badge');
   var fill = document.getElementById('progress-fill');
   if (total > 0) {
@@ -1073,20 +2299,385 @@ function updateWatchedUI() {
     if (pb)   pb.textContent = 'Progress: ' + watched + '/' + total + ' (' + pct + '%)';
     if (fill) fill.style.width = pct + '%';
   }
+
+  /* split output: leave this page's tally for index.html */
+  var nav = _pageNav();
+  if (nav) {
+    _save('_p', function () {
+      var done = _load('_p', {});
+      done[nav.self] = [_prog.w, total];
+      return done;
+    });
+  }
+}
+
+/* ═══════════════════════════════════
+   COURSE INDEX  (#course-data / #course-index)
+═══════════════════════════════════ */
+/* [[subject, rows, [[topic, rows], ...]], ...], keyed by index: subjects and
+   topics carry data-k="s" / "s.t".  Island pages (#course-data) have rows of
+   [lid, title, videos(, pdfs)] and render bodies from them; a video is a
+   url-book reference, '~' + a YouTube id, or the URL ('=' + URL where it
+   could pass for either).  Server-rendered pages (#course-index) have rows
+   of [lid] ([lid, 0] when there is no video) and stamp bodies from
+   <template>s.  Either way a body stays data-lazy until _materialize()
+   fills it.  _course() also derives lid -> gidx (gx) and, per gidx, the
+   nearest playable lecture at or after it (nx) and at or before it (pv). */
+var _cd;
+var _ISLAND_REF = /^\d*(?:,\d+)?:/;
+var _ESC_RE     = /[&<>"']/g;
+var _ESC        = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;' };
+function _esc(s) { return String(s).replace(_ESC_RE, function (c) { return _ESC[c]; }); }
+
+function _course() {
+  if (_cd === undefined) {
+    var el = document.getElementById('course-data') || document.getElementById('course-index');
+    _cd = null;
+    if (el) {
+      var nav = _pageNav();
+      var g   = nav ? nav.first : 0;      /* split pages keep global gidx */
+      var play = [];
+      _cd = { s: JSON.parse(el.textContent), o: [], sn: [], g: g, n: 0, island: el.id === 'course-data', gx: new Map() };
+      var rows = function (list) {
+        list.forEach(function (r) {
+          _cd.gx.set(r[0], g++);
+          play.push(_cd.island ? r[2].length > 0 : r[1] !== 0);
+        });
+      };
+      _cd.s.forEach(function (sub) {
+        var o = [g];                     /* first gidx: direct rows, then each topic */
+        rows(sub[1]);
+        sub[2].forEach(function (t) { o.push(g); rows(t[1]); });
+        _cd.o.push(o);
+        _cd.sn.push(g - o[0]);
+      });
+      _cd.n  = g - _cd.g;
+      _cd.nx = new Int32Array(_cd.n);
+      _cd.pv = new Int32Array(_cd.n);
+      for (var i = _cd.n - 1, p = -1; i >= 0; i--) _cd.nx[i] = p = play[i] ? _cd.g + i : p;
+      for (i = 0, p = -1; i < _cd.n; i++) _cd.pv[i] = p = play[i] ? _cd.g + i : p;
+    }
+  }
+  return _cd;
+}
+function _lectureTotal() {
+  var c = _course();
+  return c ? c.n : 0;
+}
+/* The nearest lecture with a video from gidx on, stepping d (+1 / -1);
+   -1 when this page has none that way. */
+function _playable(gidx, d) {
+  var c = _course();
+  if (!c || !c.n) return -1;
+  var i = gidx - c.g;
+  if (i < 0) return d > 0 ? c.nx[0] : -1;
+  if (i >= c.n) return d < 0 ? c.pv[c.n - 1] : -1;
+  return d > 0 ? c.nx[i] : c.pv[i];
+}
+function _entryByLid(lid) {
+  var c = _course();
+  return c && c.gx.has(lid) ? _entryAt(c.gx.get(lid)) : null;
+}
+
+function _entryHtml(row, gidx) {
+  var lid    = row[0];
+  var eta    = _esc(row[1]);
+  var videos = row[2];
+  var multi  = videos.length > 1;
+  var w      = watchedSet.has(lid);
+  var links  = videos.map(function (v, i) {
+    var yt = v.charAt(0) === '~';
+    var label = multi ? 'Part ' + (i + 1) + ' &#9654;' : yt ? '&#9654;&nbsp;YouTube' : '&#9654;&nbsp;Play';
+    var data, aria;
+    if (yt) {
+      data = 'data-yt="' + _esc(v.slice(1)) + '"';
+      aria = 'Watch on YouTube: ' + eta;
+    } else {
+      if (_ISLAND_REF.test(v)) data = 'data-u="' + _esc(v) + '"';
+      else data = 'data-url="' + _esc(v.charAt(0) === '=' ? v.slice(1) : v) + '"';
+      aria = 'Play ' + eta + (multi ? ' part ' + (i + 1) : '');
+    }
+    return '<a href="#" class="list-item video-item' + (yt ? ' yt-item' : '') + '" role="button" tabindex="0" ' +
+      data + ' data-lid="' + lid + '" data-title="' + eta + '" data-gidx="' + gidx + '"' +
+      ' aria-label="' + _esc(aria) + '">' +
+      label + '</a>';
+  });
+  (row[3] || []).forEach(function (u) {
+    links.push('<a href="' + _esc(u) + '" target="_blank" rel="noopener noreferrer"' +
+      ' class="list-item pdf-item" aria-label="Open PDF for ' + eta + '">' +
+      '<i class="fa-solid fa-file-pdf" aria-hidden="true"></i>&nbsp;PDF</a>');
+  });
+  return '<div class="lecture-entry' + (w ? ' watched' : '') + (gidx === currentGIdx ? ' now-active' : '') +
+    '" data-lid="' + lid + '" data-gidx="' + gidx + '"><div class="lecture-meta">' +
+    '<button class="watch-btn" data-lid="' + lid + '"' +
+    ' aria-label="Mark as watched" aria-pressed="' + w + '" title="Mark watched">' + (w ? '&#10003;' : '&#9675;') + '</button>' +
+    '<p class="lecture-title" data-title="' + eta + '">' + eta + '</p>' +
+    (videos.length ? '<button class="copy-btn" data-lid="' + lid + '"' +
+      ' aria-label="Copy link" title="Copy link"><i class="fa-solid fa-link" aria-hidden="true"></i></button>' : '') +
+    '</div><div class="lecture-links">' + links.join('') + '</div></div>';
+}
+function _rowsHtml(rows, gidx) {
+  return rows.map(function (r, i) { return _entryHtml(r, gidx + i); }).join('');
+}
+function _topicHtml(t, k) {
+  var name = _esc(t[0]);
+  var tc   = t[1].length;
+  return '<div class="topic-accordion" data-k="' + k + '">' +
+    '<button class="topic-header" aria-expanded="false" aria-controls="tc-' + name + '">' +
+    '<i class="fa-solid fa-folder" aria-hidden="true"></i>' +
+    '<span class="topic-name">' + name + '</span>' +
+    '<span class="topic-count" aria-label="' + tc + ' lectures">' + tc + '</span>' +
+    '<span class="topic-progress" aria-live="polite"></span>' +
+    '</button><div class="topic-content" id="tc-' + name + '" data-lazy></div></div>';
+}
+function _subjectHtml(sub, s) {
+  var name  = _esc(sub[0]);
+  var total = _course().sn[s];
+  return '<div class="accordion-item" data-k="' + s + '">' +
+    '<button class="accordion-header" aria-expanded="false" aria-controls="ac-' + name + '">' +
+    '<span class="sub-name">' + name + '</span>' +
+    '<span class="sub-count" aria-label="' + total + ' lectures">' + total + '</span>' +
+    '<span class="sub-progress" aria-live="polite"></span>' +
+    '<span class="acc-arrow" aria-hidden="true">&#43;</span>' +
+    '</button><div class="accordion-content" id="ac-' + name + '" data-lazy></div></div>';
+}
+/* Subject headers only; everything below them waits for _materialize */
+function _renderIsland() {
+  var c = _course();
+  if (!c || !c.island) return;
+  document.getElementById('content-container')
+    .insertAdjacentHTML('beforeend', c.s.map(_subjectHtml).join('\n'));
+}
+/* Fill a lazy .accordion-content / .topic-content (no-op once filled):
+   island pages render it from #course-data, others stamp its <template>. */
+function _materialize(el) {
+  if (!el || !el.hasAttribute('data-lazy')) return;
+  el.removeAttribute('data-lazy');
+  var k   = el.parentNode.dataset.k;
+  var p   = k.split('.');
+  var tpl = el.firstElementChild;
+  if (tpl && tpl.tagName === 'TEMPLATE') {
+    el.removeChild(tpl);
+    _stampList(el, tpl.content);
+  } else {
+    var sub = _course().s[+p[0]];
+    var o   = _course().o[+p[0]];
+    if (p.length > 1) _fillList(el, sub[2][+p[1]][1], o[+p[1] + 1], '');
+    else _fillList(el, sub[1], o[0], sub[2].map(function (t, i) { return _topicHtml(t, k + '.' + i); }).join(''));
+  }
+  _adopt(el);
+  if (p.length === 1) {                   /* new topic headers */
+    el.querySelectorAll('.topic-header').forEach(_bindTopicHeader);
+    _paintSubject(+k);
+  }
+}
+/* Live entries by gidx.  Everything that puts entries in the DOM passes
+   them through _adopt(), which also paints watched state and applies the
+   running search. */
+var _entries = new Map();
+function _adopt(root) {
+  root.querySelectorAll('.lecture-entry[data-gidx]').forEach(function (e) {
+    var g = +e.dataset.gidx;
+    _entries.set(g, e);
+    _paintEntry(e);
+    if (_hits && _hits.has(g)) _markEntry(e, true);
+    else if (e.classList.contains('hit')) _markEntry(e, false);   /* re-attached */
+  });
+}
+function _materializeKey(k) {
+  _materialize(document.querySelector('[data-k="' + k + '"] > [data-lazy]'));
+}
+/* The entry for a global index, rendering its subject/topic if needed */
+function _entryAt(gidx) {
+  var entry = _entries.get(gidx);
+  var c     = _course();
+  if (entry || !c || gidx < c.g || gidx >= c.g + c.n) return entry;
+  var s = c.o.length - 1;
+  while (c.o[s][0] > gidx) s--;
+  var t = c.o[s].length - 1;
+  while (t > 0 && c.o[s][t] > gidx) t--;
+  _materializeKey(s);
+  if (t > 0) _materializeKey(s + '.' + (t - 1));
+  document.querySelectorAll('.vblock[data-lazy]').forEach(function (b) {
+    if (b._g <= gidx && gidx < b._g + b._rows.length) _fillBlock(b);
+  });
+  return _entries.get(gidx);
+}
+/* ═══════════════════════════════════
+   VIRTUAL LISTS  (long lecture lists)
+═══════════════════════════════════ */
+/* A list longer than _VLIST_MIN rows becomes .vblock placeholders of
+   _VBLOCK rows each, sized by estimate.  Blocks near the viewport are
+   filled; blocks that scroll far away are emptied again, keeping their
+   measured height, so only visible rows plus a buffer exist in the DOM.
+   Island blocks hold #course-data rows and render them on each fill;
+   stamped blocks (_stampList) hold the <template>'s own entry nodes and
+   just move them in and out of the document. */
+var _VLIST_MIN  = 120;
+var _VBLOCK     = 40;
+var _VROW_EST   = 88;
+var _vobs       = null;
+var _searchTerm = '';
+
+function _fillList(el, rows, gidx, after) {
+  if (rows.length <= _VLIST_MIN) {
+    el.innerHTML = _rowsHtml(rows, gidx) + after;
+    return;
+  }
+  var html = [];
+  for (var i = 0; i < rows.length; i += _VBLOCK) {
+    var n = Math.min(_VBLOCK, rows.length - i);
+    html.push('<div class="vblock" data-lazy style="height:' + n * _VROW_EST + 'px"></div>');
+  }
+  el.innerHTML = html.join('') + after;
+  var blocks = el.querySelectorAll('.vblock');
+  for (var b = 0; b < blocks.length; b++) {
+    blocks[b]._rows = rows.slice(b * _VBLOCK, (b + 1) * _VBLOCK);
+    blocks[b]._g    = gidx + b * _VBLOCK;
+    _observeBlock(blocks[b]);
+  }
+}
+function _stampList(el, frag) {
+  var kids = frag.children, n = 0, blocks = [];
+  while (n < kids.length && kids[n].classList.contains('lecture-entry')) n++;
+  if (n > _VLIST_MIN) {
+    var list = Array.prototype.slice.call(kids, 0, n);
+    var g    = +list[0].dataset.gidx;
+    for (var i = 0; i < n; i += _VBLOCK) {
+      var b = document.createElement('div');
+      b.className = 'vblock';
+      b.setAttribute('data-lazy', '');
+      b._rows = list.slice(i, i + _VBLOCK);
+      b._g    = g + i;
+      b._stamped = true;
+      b.style.height = b._rows.length * _VROW_EST + 'px';
+      frag.insertBefore(b, list[0]);
+      blocks.push(b);
+    }
+    list.forEach(function (e) { frag.removeChild(e); });
+  }
+  el.appendChild(frag);
+  blocks.forEach(_observeBlock);
+}
+function _observeBlock(b) {
+  if (typeof IntersectionObserver === 'undefined') { _fillBlock(b); return; }
+  if (!_vobs) {
+    _vobs = new IntersectionObserver(function (entries) {
+      entries.forEach(function (e) {
+        if (e.isIntersecting) _fillBlock(e.target);
+        else if (!_searchTerm) _emptyBlock(e.target);
+      });
+    }, { rootMargin: '800px 0px' });
+  }
+  _vobs.observe(b);
+}
+function _fillBlock(b) {
+  if (!b.hasAttribute('data-lazy')) return;
+  b.removeAttribute('data-lazy');
+  if (b._stamped) b._rows.forEach(function (e) { b.appendChild(e); });
+  else b.innerHTML = _rowsHtml(b._rows, b._g);
+  b.style.height = '';
+  _adopt(b);
+  if (currentGIdx >= b._g && currentGIdx < b._g + b._rows.length) {
+    var btn = _entries.get(currentGIdx).querySelector('.video-item');
+    if (btn) { btn.classList.add('playing'); currentlyPlayingBtn = btn; }
+  }
+}
+function _emptyBlock(b) {
+  if (b.hasAttribute('data-lazy') || b.contains(document.activeElement)) return;
+  if (currentGIdx >= b._g && currentGIdx < b._g + b._rows.length) return;   /* keep now-playing */
+  b.style.height = b.offsetHeight + 'px';
+  b.setAttribute('data-lazy', '');
+  b.innerHTML = '';
+  for (var g = b._g; g < b._g + b._rows.length; g++) _entries.delete(g);
+}
+/* Search: fill blocks holding a match and hide the rest; once cleared,
+   re-observe so blocks far from the viewport are emptied again. */
+function _filterBlocks() {
+  document.querySelectorAll('.vblock').forEach(function (b) {
+    var hit = !_hits;
+    for (var g = b._g; !hit && g < b._g + b._rows.length; g++) hit = _hits.has(g);
+    b.style.display = hit ? '' : 'none';
+    if (_hits && hit) _fillBlock(b);
+    if (!_hits && _vobs) { _vobs.unobserve(b); _vobs.observe(b); }
+  });
 }
 
+/* ═══════════════════════════════════
+   PERSISTENCE  (coalesced)
+═══════════════════════════════════ */
+/* Progress goes to localStorage through _save(key, fn): the key is marked
+   dirty and fn builds its value when the buffer is flushed, _FLUSH_MS
+   later in an idle slot, or at once when the tab is hidden or unloaded.
+   A burst of timeupdates and toggles costs one setItem per key.  _flush()
+   reports whether every write went through. */
+var _FLUSH_MS   = 4000;
+var _RESUME_MAX = 300;
+var _dirty      = {};
+var _flushTimer = null;
+
+function _load(key, dflt) {
+  try { return JSON.parse(localStorage.getItem(FILE_KEY + key)) || dflt; } catch (e) { return dflt; }
+}
+function _save(key, fn) {
+  _dirty[key] = fn;
+  if (_flushTimer) return;
+  _flushTimer = setTimeout(function () {
+    if (window.requestIdleCallback) requestIdleCallback(_flush, { timeout: 1000 });
+    else _flush();
+  }, _FLUSH_MS);
+}
+function _flush() {
+  var d  = _dirty;
+  var ok = true;
+  clearTimeout(_flushTimer);
+  _flushTimer = null;
+  _dirty      = {};
+  Object.keys(d).forEach(function (k) {
+    try { localStorage.setItem(FILE_KEY + k, JSON.stringify(d[k]())); } catch (e) { ok = false; }
+  });
+  return ok;
+}
+document.addEventListener('visibilitychange', function () {
+  if (document.visibilityState === 'hidden') _flush();
+});
+window.addEventListener('pagehide', _flush);
+
 /* ═══════════════════════════════════
    CONTINUE WATCHING
 ═══════════════════════════════════ */
-function saveLastPlayed(url, title, time) {
-  var now = Date.now();
-  if (now - lastSaveTime < 5000) return;
-  lastSaveTime = now;
-  try { localStorage.setItem(FILE_KEY + '_last', JSON.stringify({ url: url, title: title, time: Math.floor(time) })); } catch (e) {}
+/* _last feeds the "Continue" banner; _r keeps lid -> [seconds, when] for
+   the _RESUME_MAX most recently played lectures. */
+var _resume = null;
+function _resumeMap() {
+  if (!_resume) _resume = _load('_r', {});
+  return _resume;
+}
+function _resumePoint(lid) {
+  var r = lid && _resumeMap()[lid];
+  return r && r[0] > 5 ? r[0] : 0;
+}
+function _savePosition(time) {
+  var last = { url: currentPlayUrl, title: currentPlayTitle, time: Math.floor(time), lid: currentLid };
+  _resumeMap()[currentLid] = [last.time, Date.now()];
+  _save('_last', function () { return last; });
+  _save('_r', function () {
+    var lids = Object.keys(_resume);
+    if (lids.length > _RESUME_MAX) {
+      lids.sort(function (a, b) { return _resume[a][1] - _resume[b][1]; });
+      lids.slice(0, lids.length - _RESUME_MAX).forEach(function (l) { delete _resume[l]; });
+    }
+    return _resume;
+  });
+}
+function _clearPosition(lid) {
+  if (!lid || !_resumeMap()[lid]) return;
+  delete _resume[lid];
+  _save('_r', function () { return _resume; });
 }
 function checkResume() {
   try {
-    var s = JSON.parse(localStorage.getItem(FILE_KEY + '_last') || 'null');
+    var s = _load('_last', null);
     if (s && s.url && s.time > 5) {
       var m   = Math.floor(s.time / 60);
       var sec = String(s.time % 60).padStart(2, '0');
@@ -1095,12 +2686,16 @@ function checkResume() {
       document.getElementById('resume-banner').style.display = 'flex';
       window._resumeUrl  = s.url;
       window._resumeTime = s.time;
+      window._resumeLid  = s.lid;
     }
   } catch (e) {}
 }
 function resumeVideo() {
   document.getElementById('resume-banner').style.display = 'none';
   if (!window._resumeUrl) return;
+  var entry = window._resumeLid && _entryByLid(window._resumeLid);
+  var btn   = entry && entry.querySelector('.video-item');
+  if (btn) { btn.click(); return; }       /* picks up its own resume point */
   var ytId = _getYtId(window._resumeUrl);
   if (ytId) {
     _showYTPlayer(ytId);
@@ -1112,6 +2707,7 @@ function resumeVideo() {
 }
 function dismissResume() {
   document.getElementById('resume-banner').style.display = 'none';
+  delete _dirty._last;
   try { localStorage.removeItem(FILE_KEY + '_last'); } catch (e) {}
 }
 
@@ -1142,14 +2738,16 @@ function expandAll() {
     b.classList.add('active');
     b.setAttribute('aria-expanded', 'true');
     var content = b.nextElementSibling;
+    _materialize(content);
     content.classList.add('open');
-    content.style.maxHeight = content.scrollHeight + 'px';
+    _expandBody(content);
   });
   document.querySelectorAll('.topic-header').forEach(function (b) {
     b.classList.add('active');
     b.setAttribute('aria-expanded', 'true');
     var content = b.nextElementSibling;
-    content.style.maxHeight = content.scrollHeight + 'px';
+    _materialize(content);
+    _expandBody(content);
   });
 }
 function collapseAll() {
@@ -1183,63 +2781,121 @@ function clearSearch() {
   filterContent('');
 }
 
-function _doFilter(rawTerm) {
-  var term    = rawTerm.trim().toLowerCase();
-  var esc_re  = term ? new RegExp('(' + term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&') + ')', 'gi') : null;
-  var visible = 0;
-
-  document.querySelectorAll('.accordion-item').forEach(function (subEl) {
-    var subHasVisible = false;
-
-    subEl.querySelectorAll('.topic-accordion').forEach(function (topicEl) {
-      var topicHasVisible = false;
-      topicEl.querySelectorAll('.lecture-entry').forEach(function (lec) {
-        var titleEl = lec.querySelector('.lecture-title');
-        var orig    = titleEl.dataset.title || titleEl.textContent;
-        var match   = !term || orig.toLowerCase().indexOf(term) !== -1;
-        lec.style.display = match ? '' : 'none';
-        if (match) {
-          topicHasVisible = true;
-          subHasVisible   = true;
-          visible++;
-          titleEl.innerHTML = term ? orig.replace(esc_re, '<mark>$1</mark>') : orig;
-        }
+/* Matching runs over #search-index (island pages build the same string
+   from #course-data): all titles lowercased, in gidx order, one per line.
+   The hits are a Set of gidx; entries, topics and subjects that match
+   carry .hit and everything else under .searching is hidden by CSS, so a
+   new term only touches what enters, leaves or stays in the result. */
+var _st      = null;
+var _hits    = null;
+var _hitKeys = new Set();
+var _hitRe   = null;
+
+function _searchText() {
+  if (!_st) {
+    var el = document.getElementById('search-index');
+    var text;
+    if (el) text = JSON.parse(el.textContent);
+    else {
+      var titles = [];
+      _course().s.forEach(function (sub) {
+        [sub[1]].concat(sub[2].map(function (t) { return t[1]; })).forEach(function (rows) {
+          rows.forEach(function (r) { titles.push(r[1].replace(/\n/g, ' ')); });
+        });
       });
-      topicEl.style.display = topicHasVisible ? '' : 'none';
-      if (term && topicHasVisible) {
-        var th = topicEl.querySelector('.topic-header');
-        th.classList.add('active');
-        th.setAttribute('aria-expanded', 'true');
-        topicEl.querySelector('.topic-content').style.maxHeight = '99999px';
-      }
-    });
-
-    subEl.querySelectorAll('.accordion-content > .lecture-entry').forEach(function (lec) {
-      var titleEl = lec.querySelector('.lecture-title');
-      var orig    = titleEl.dataset.title || titleEl.textContent;
-      var match   = !term || orig.toLowerCase().indexOf(term) !== -1;
-      lec.style.display = match ? '' : 'none';
-      if (match) {
-        subHasVisible = true;
-        visible++;
-        titleEl.innerHTML = term ? orig.replace(esc_re, '<mark>$1</mark>') : orig;
-      }
-    });
-
-    subEl.style.display = subHasVisible ? '' : 'none';
-    if (term && subHasVisible) {
-      var ah = subEl.querySelector('.accordion-header');
-      ah.classList.add('active');
-      ah.setAttribute('aria-expanded', 'true');
-      var ac = subEl.querySelector('.accordion-content');
-      ac.classList.add('open');
-      ac.style.maxHeight = '99999px';
+      text = titles.join('\n').toLowerCase();
     }
+    var starts = [0];
+    for (var i = text.indexOf('\n'); i !== -1; i = text.indexOf('\n', i + 1)) starts.push(i + 1);
+    _st = { text: text, starts: starts };
+  }
+  return _st;
+}
+/* Sorted gidx of every title containing term */
+function _search(term) {
+  var st  = _searchText();
+  var out = [];
+  var p   = st.text.indexOf(term);
+  while (p !== -1) {
+    var lo = 0, hi = st.starts.length - 1;     /* last line starting at or before p */
+    while (lo < hi) {
+      var mid = (lo + hi + 1) >> 1;
+      if (st.starts[mid] <= p) lo = mid; else hi = mid - 1;
+    }
+    out.push(_course().g + lo);
+    if (lo + 1 >= st.starts.length) break;
+    p = st.text.indexOf(term, st.starts[lo + 1]);
+  }
+  return out;
+}
+/* data-k of every subject / topic holding one of the (sorted) hits */
+function _matchKeys(hits) {
+  var c    = _course();
+  var keys = new Set();
+  var s    = 0;
+  hits.forEach(function (g) {
+    while (s + 1 < c.o.length && c.o[s + 1][0] <= g) s++;
+    var t = c.o[s].length - 1;
+    while (t > 0 && c.o[s][t] > g) t--;
+    keys.add(s + '');
+    if (t > 0) keys.add(s + '.' + (t - 1));
+  });
+  return keys;
+}
+function _highlight(text) {
+  return text.split(_hitRe).map(function (part, i) {
+    return i % 2 ? '<mark>' + _esc(part) + '</mark>' : _esc(part);
+  }).join('');
+}
+function _markEntry(e, on) {
+  var t = e.querySelector('.lecture-title');
+  e.classList.toggle('hit', on);
+  if (on) t.innerHTML = _highlight(t.dataset.title);
+  else t.textContent = t.dataset.title;
+}
+function _markKey(k, on) {
+  var box = document.querySelector('[data-k="' + k + '"]');
+  if (!box) return;
+  box.classList.toggle('hit', on);
+  if (!on) return;
+  var sub = k.indexOf('.') === -1;
+  var hd  = box.querySelector(sub ? '.accordion-header' : '.topic-header');
+  var bd  = hd.nextElementSibling;
+  hd.classList.add('active');
+  hd.setAttribute('aria-expanded', 'true');
+  if (sub) bd.classList.add('open');
+  bd.style.maxHeight = '99999px';
+}
+
+function _doFilter(rawTerm) {
+  var term = rawTerm.trim().toLowerCase();
+  var c    = _course();
+  var old  = _hits || new Set();
+  if (!c) return;
+  var list = term ? _search(term) : [];
+  var keys = term ? _matchKeys(list) : new Set();
+  _searchTerm = term;
+  _hits       = term ? new Set(list) : null;
+  _hitRe      = term ? new RegExp('(' + term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&') + ')', 'gi') : null;
+
+  keys.forEach(_materializeKey);          /* subjects come before their topics */
+  _filterBlocks();
+  _hitKeys.forEach(function (k) { if (!keys.has(k)) _markKey(k, false); });
+  keys.forEach(function (k) { if (!_hitKeys.has(k)) _markKey(k, true); });
+  _hitKeys = keys;
+  old.forEach(function (g) {
+    var e = _entries.get(g);
+    if (e && !(_hits && _hits.has(g))) _markEntry(e, false);
   });
+  list.forEach(function (g) {
+    var e = _entries.get(g);
+    if (e) _markEntry(e, true);
+  });
+  document.getElementById('content-container').classList.toggle('searching', !!term);
 
   var cb = document.getElementById('search-result-count');
   if (cb) {
-    cb.textContent = term ? visible + ' results' : '';
+    cb.textContent = term ? list.length + ' results' : '';
     cb.style.display = term ? '' : 'none';
   }
 }
@@ -1259,26 +2915,52 @@ function setNowPlaying(title, gidx) {
     np.style.display = 'none';
   }
 }
+/* Prev / next skip lectures with no video; past this page's last
+   playable one they go on to the neighbouring split page, if any. */
 function _updateNavBtns(gidx) {
   var prevBtn = document.getElementById('btn-prev');
   var nextBtn = document.getElementById('btn-next');
-  var all     = document.querySelectorAll('.lecture-entry[data-gidx]');
-  var max     = all.length - 1;
-  if (prevBtn) prevBtn.disabled = gidx <= 0;
-  if (nextBtn) nextBtn.disabled = gidx >= max;
-}
-function playPrev() {
-  if (currentGIdx <= 0) return;
-  var entry = document.querySelector('.lecture-entry[data-gidx="' + (currentGIdx - 1) + '"]');
-  if (!entry) return;
-  var btn = entry.querySelector('.video-item');
-  if (btn) btn.click();
+  var nav     = _pageNav();
+  if (prevBtn) prevBtn.disabled = _playable(gidx - 1, -1) === -1 && !(nav && nav.prev);
+  if (nextBtn) nextBtn.disabled = _playable(gidx + 1, 1) === -1 && !(nav && nav.next);
 }
-function playNext() {
-  var entry = document.querySelector('.lecture-entry[data-gidx="' + (currentGIdx + 1) + '"]');
+function _step(d) {
+  var g = _playable(currentGIdx + d, d);
+  if (g === -1) { _playOnOtherPage(d); return; }
+  _entryAt(g).querySelector('.video-item').click();
+}
+function playPrev() { if (currentGIdx > 0) _step(-1); }
+function playNext() { _step(1); }
+
+/* ═══════════════════════════════════
+   SPLIT OUTPUT  (one page per subject)
+═══════════════════════════════════ */
+var _nav;
+function _pageNav() {
+  if (_nav === undefined) {
+    var el = document.getElementById('page-nav');
+    _nav = el ? JSON.parse(el.textContent) : null;
+  }
+  return _nav;
+}
+/* #play=N plays lecture N, or the nearest playable one after it;
+   #play=N- (from a next page's prev button) searches backwards. */
+function _playOnOtherPage(d) {
+  var nav  = _pageNav();
+  var page = nav && (d > 0 ? nav.next : nav.prev);
+  if (page) window.location.href = page + (d > 0 ? '#play=' + (nav.last + 1) : '#play=' + (nav.first - 1) + '-');
+}
+function _openFromHash() {
+  var m = window.location.hash.match(/^#play=(\d+)(-?)$/);
+  if (!m) return;
+  try { history.replaceState(null, '', window.location.pathname + window.location.search); } catch (e) {}
+  var g     = _playable(+m[1], m[2] ? -1 : 1);
+  var entry = _entryAt(g === -1 ? +m[1] : g);
   if (!entry) return;
   var btn = entry.querySelector('.video-item');
-  if (btn) btn.click();
+  if (btn) { btn.click(); return; }
+  _openParentAccordions(entry);
+  entry.scrollIntoView({ block: 'center' });
 }
 
 /* ═══════════════════════════════════
@@ -1324,10 +3006,10 @@ function playAutoNext() {
    COPY LINK
 ═══════════════════════════════════ */
 function copyLectureLink(lid) {
-  var entry = document.querySelector('.lecture-entry[data-lid="' + lid + '"]');
+  var entry = _entryByLid(lid);
   if (!entry) return;
   var btn = entry.querySelector('.video-item');
-  var url = btn ? btn.dataset.url : window.location.href;
+  var url = (btn && _expandUrl(btn)) || window.location.href;
   if (navigator.clipboard && window.isSecureContext) {
     navigator.clipboard.writeText(url).then(function () {
       showToast('Link copied to clipboard!', 'success');
@@ -1430,13 +3112,31 @@ function _showDirectPlayer() {
   if (pw)    pw.style.display = 'block';
 }
 
+/* ═══════════════════════════════════
+   URL DICTIONARY  (data-u="p,s:rest")
+═══════════════════════════════════ */
+var _urlBook = null;
+function _expandUrl(el) {
+  if (el.dataset.url) return el.dataset.url;
+  var v = el.dataset.u;
+  if (!v) return null;
+  if (!_urlBook) {
+    var src = document.getElementById('url-book');
+    _urlBook = src ? JSON.parse(src.textContent) : { p: [], s: [] };
+  }
+  var i   = v.indexOf(':');
+  var ref = v.slice(0, i).split(',');
+  return (ref[0] ? _urlBook.p[+ref[0]] : '') + v.slice(i + 1) +
+         (ref[1] ? _urlBook.s[+ref[1]] : '');
+}
+
 /* ═══════════════════════════════════
    PLAYER — PLAY VIDEO
 ═══════════════════════════════════ */
 function playVideo(event, element) {
   if (event) event.preventDefault();
   var ytId  = element.dataset.yt  || null;
-  var url   = element.dataset.url || null;
+  var url   = _expandUrl(element);
   var lid   = element.dataset.lid   || null;
   var title = element.dataset.title || '';
   var gidx  = parseInt(element.dataset.gidx, 10);
@@ -1471,13 +3171,27 @@ function playVideo(event, element) {
     _showYTPlayer(ytId);
     showToast('▶ YouTube video loading…', 'info', 1800);
   } else {
+    var at = _resumePoint(lid);
     currentPlayUrl = url;
     setLoading(true);
     _showDirectPlayer();
-    setTimeout(function () { loadNewVideo(url, 0); }, 50);
+    if (at) showToast('Resuming at ' + Math.floor(at / 60) + ':' + String(at % 60).padStart(2, '0'), 'info', 1800);
+    setTimeout(function () { loadNewVideo(url, at); }, 50);
   }
 }
 
+/* Animate a body open, then lift the cap: windowed blocks and
+   content-visibility rows change height once they are laid out. */
+function _expandBody(el) {
+  if (el.style.maxHeight === 'none') return;
+  el.style.maxHeight = el.scrollHeight + 'px';
+  el.addEventListener('transitionend', function fix(e) {
+    if (e.target !== el) return;
+    el.removeEventListener('transitionend', fix);
+    if (el.previousElementSibling.classList.contains('active')) el.style.maxHeight = 'none';
+  });
+}
+
 function _openParentAccordions(entry) {
   var topicContent = entry.closest('.topic-content');
   if (topicContent) {
@@ -1485,7 +3199,7 @@ function _openParentAccordions(entry) {
     if (th && !th.classList.contains('active')) {
       th.classList.add('active');
       th.setAttribute('aria-expanded', 'true');
-      topicContent.style.maxHeight = topicContent.scrollHeight + 'px';
+      _expandBody(topicContent);
     }
   }
   var accContent = entry.closest('.accordion-content');
@@ -1495,7 +3209,7 @@ function _openParentAccordions(entry) {
       ah.classList.add('active');
       ah.setAttribute('aria-expanded', 'true');
       accContent.classList.add('open');
-      accContent.style.maxHeight = accContent.scrollHeight + 'px';
+      _expandBody(accContent);
     }
   }
 }
@@ -1518,7 +3232,7 @@ function _attachEvents(startTime) {
     var dur = player.duration;
     var cur = player.currentTime;
     if (dur > 0 && cur > 3) {
-      saveLastPlayed(currentPlayUrl, currentPlayTitle, cur);
+      if (currentLid) _savePosition(cur);
       if (currentLid && (cur / dur) > 0.80 && !autoMarked.has(currentLid)) {
         autoMarked.add(currentLid);
         markWatched(currentLid);
@@ -1527,10 +3241,9 @@ function _attachEvents(startTime) {
   });
 
   player.on('ended', function () {
-    var nextEntry = document.querySelector(
-      '.lecture-entry[data-gidx="' + (currentGIdx + 1) + '"]'
-    );
-    if (nextEntry) _startAutoNext(nextEntry);
+    var g = _playable(currentGIdx + 1, 1);
+    _clearPosition(currentLid);
+    if (g !== -1) _startAutoNext(_entryAt(g));
   });
 
   player.on('enterfullscreen', function () {
@@ -1756,6 +3469,28 @@ function _initKeyboard() {
   });
 }
 
+/* ═══════════════════════════════════
+   LECTURE CONTROLS  (delegated)
+═══════════════════════════════════ */
+/* Play, watched and copy buttons carry no inline handlers: one click and
+   one keydown listener on #content-container dispatch on their class. */
+function _initLectureEvents() {
+  var box = document.getElementById('content-container');
+  if (!box) return;
+  box.addEventListener('click', function (e) {
+    var el = e.target.closest('.video-item, .watch-btn, .copy-btn');
+    if (!el) return;
+    if (el.classList.contains('video-item')) playVideo(e, el);
+    else if (el.classList.contains('watch-btn')) toggleWatched(el.dataset.lid);
+    else copyLectureLink(el.dataset.lid);
+  });
+  box.addEventListener('keydown', function (e) {
+    if (e.key !== 'Enter' && e.key !== ' ') return;
+    var el = e.target.closest('.video-item');
+    if (el) { e.preventDefault(); playVideo(e, el); }
+  });
+}
+
 /* ═══════════════════════════════════
    ACCORDIONS
 ═══════════════════════════════════ */
@@ -1776,14 +3511,9 @@ function _initAccordions() {
         btn.classList.add('active');
         btn.setAttribute('aria-expanded', 'true');
         var content = btn.nextElementSibling;
+        _materialize(content);
         content.classList.add('open');
-        content.style.maxHeight = content.scrollHeight + 'px';
-        content.addEventListener('transitionend', function fix() {
-          content.removeEventListener('transitionend', fix);
-          if (btn.classList.contains('active')) {
-            content.style.maxHeight = 'none';
-          }
-        }, { once: true });
+        _expandBody(content);
       } else {
         btn.classList.remove('active');
         btn.setAttribute('aria-expanded', 'false');
@@ -1797,42 +3527,46 @@ function _initAccordions() {
     });
   });
 
-  document.querySelectorAll('.topic-header').forEach(function (btn) {
-    btn.addEventListener('click', function () {
-      var isActive = btn.classList.contains('active');
-      var pc       = btn.closest('.accordion-content');
+  document.querySelectorAll('.topic-header').forEach(_bindTopicHeader);
+}
+function _bindTopicHeader(btn) {
+  btn.addEventListener('click', function () {
+    var isActive = btn.classList.contains('active');
+    var pc       = btn.closest('.accordion-content');
 
-      if (pc) {
-        pc.querySelectorAll('.topic-header').forEach(function (b) {
-          if (b !== btn) {
-            b.classList.remove('active');
-            b.setAttribute('aria-expanded', 'false');
-            b.nextElementSibling.style.maxHeight = null;
-          }
-        });
-      }
+    if (pc) {
+      pc.querySelectorAll('.topic-header').forEach(function (b) {
+        if (b !== btn) {
+          b.classList.remove('active');
+          b.setAttribute('aria-expanded', 'false');
+          b.nextElementSibling.style.maxHeight = null;
+        }
+      });
+    }
 
-      if (!isActive) {
-        btn.classList.add('active');
-        btn.setAttribute('aria-expanded', 'true');
-        var tc = btn.nextElementSibling;
-        tc.style.maxHeight = tc.scrollHeight + 'px';
-
-        if (pc) {
-          var subHeader = pc.previousElementSibling;
-          if (subHeader && !subHeader.classList.contains('active')) {
-            subHeader.classList.add('active');
-            subHeader.setAttribute('aria-expanded', 'true');
-            pc.classList.add('open');
-            pc.style.maxHeight = 'none';
-          }
+    if (!isActive) {
+      btn.classList.add('active');
+      btn.setAttribute('aria-expanded', 'true');
+      var tc = btn.nextElementSibling;
+      _materialize(tc);
+      _expandBody(tc);
+
+      if (pc) {
+        var subHeader = pc.previousElementSibling;
+        if (subHeader && !subHeader.classList.contains('active')) {
+          subHeader.classList.add('active');
+          subHeader.setAttribute('aria-expanded', 'true');
+          pc.classList.add('open');
+          pc.style.maxHeight = 'none';
         }
-      } else {
-        btn.classList.remove('active');
-        btn.setAttribute('aria-expanded', 'false');
-        btn.nextElementSibling.style.maxHeight = null;
       }
-    });
+    } else {
+      btn.classList.remove('active');
+      btn.setAttribute('aria-expanded', 'false');
+      var tc2 = btn.nextElementSibling;
+      tc2.style.maxHeight = tc2.scrollHeight + 'px';
+      requestAnimationFrame(function () { tc2.style.maxHeight = null; });
+    }
   });
 }
 
@@ -1841,23 +3575,28 @@ function _initAccordions() {
 ═══════════════════════════════════ */
 document.addEventListener('DOMContentLoaded', function () {
   initDarkMode();
-  loadWatched();
-  checkResume();
-  _initAccordions();
-  _initKeyboard();
-  _setupDoubleTapSeek();
+  /* compressed pages fill #content-container asynchronously */
+  (window.__contentReady || Promise.resolve()).then(function () {
+    _renderIsland();
+    loadWatched();
+    checkResume();
+    _initAccordions();
+    _initLectureEvents();
+    _initKeyboard();
+    _setupDoubleTapSeek();
+    if (_pageNav()) {
+      var h = document.querySelector('.accordion-header');
+      if (h && !h.classList.contains('active')) h.click();
+      _openFromHash();
+    }
+  });
 });
 """
 
 
-def _build_js(file_key: str) -> str:
-    safe_key = re.sub(r"[^a-zA-Z0-9_-]", "_", file_key)[:48]
-    return (
-        "const FILE_KEY = " + json.dumps(safe_key) + ";\n"
-        + _JS_BODY
-        + "\n"
-        + _DRAWER_JS
-    )
+def _file_key(file_name: str) -> str:
+    """JS string literal used as the localStorage key prefix for a page."""
+    return json.dumps(re.sub(r"[^a-zA-Z0-9_-]", "_", file_name)[:48])
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1875,15 +3614,399 @@ _ANTI_FOUC_JS = textwrap.dedent("""\
 """)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+#  COMPRESSED PAYLOAD BOOTSTRAP
+# ═══════════════════════════════════════════════════════════════════════════
+# With write_html(compress=...) the course markup ships as base64 gzip/zlib
+# inside #course-payload and is inflated here with DecompressionStream.
+# It runs while the page is parsing, so __contentReady exists before the
+# DOMContentLoaded handler in _JS_BODY waits on it.
+
+_PAYLOAD_JS = r"""
+window.__contentReady = (function () {
+  var box = document.getElementById('content-container');
+  var el  = document.getElementById('course-payload');
+  function fail(msg) { box.innerHTML = '<p class="empty-msg">' + msg + '</p>'; }
+  if (typeof DecompressionStream === 'undefined') {
+    fail('This browser is too old to open this page. Please update Chrome or Firefox.');
+    return Promise.resolve();
+  }
+  try {
+    var bin   = atob(el.textContent);
+    var bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(el.dataset.enc));
+    return new Response(stream).text()
+      .then(function (markup) { box.innerHTML = markup; })
+      .catch(function () { fail('Could not unpack the course content.'); });
+  } catch (e) {
+    fail('Could not unpack the course content.');
+    return Promise.resolve();
+  }
+})();
+"""
+
+# DecompressionStream format name -> zlib wbits
+_PAYLOAD_WBITS = {"gzip": 31, "deflate": 15}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  SPLIT OUTPUT INDEX
+# ═══════════════════════════════════════════════════════════════════════════
+# index.html of a write_split() zip: one link per subject page.  Each
+# subject page leaves its [watched, total] under FILE_KEY + '_p', which is
+# all the index needs to show progress without loading any lecture list.
+
+_INDEX_CSS = """
+a.accordion-header{text-decoration:none;}
+.index-wrap{max-width:900px;margin:0 auto;padding:16px 14px 32px;}
+"""
+
+_INDEX_JS = r"""
+function toggleDark() {
+  var d = document.documentElement.classList.toggle('dark');
+  try { localStorage.setItem('bbk_dark', d ? '1' : '0'); } catch (e) {}
+}
+(function () {
+  var done = {};
+  try { done = JSON.parse(localStorage.getItem(FILE_KEY + '_p') || '{}'); } catch (e) {}
+  var watched = 0, total = 0;
+  document.querySelectorAll('.index-link').forEach(function (a) {
+    var n = +a.dataset.count;
+    var p = done[a.getAttribute('href')];
+    total += n;
+    if (p) {
+      watched += p[0];
+      a.querySelector('.sub-progress').textContent = p[0] + '/' + n;
+    }
+  });
+  var pct = total ? Math.round(watched / total * 100) : 0;
+  document.getElementById('progress-fill').style.width = pct + '%';
+  document.getElementById('progress-badge').textContent =
+    'Progress: ' + watched + '/' + total + ' (' + pct + '%)';
+})();
+"""
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  LITE PROFILE ASSETS
+# ═══════════════════════════════════════════════════════════════════════════
+# write_html(profile="lite"): for low-end phones.  Native <video> (hls.js
+# light is fetched only when the browser can't play HLS itself), no icon
+# font, no blur/shadow/transition effects, <details> instead of the JS
+# accordion, and one delegated click listener instead of per-item handlers.
+# Watched state goes through the same _WATCHED_JS store as the full page.
+
+_LITE_CSS = """
+:root{--bg:#f6f7f9;--fg:#1e293b;--mut:#64748b;--card:#fff;--bd:#e2e8f0;--ac:#2563eb;--ok:#16a34a;}
+html.dark{--bg:#0d1117;--fg:#e6edf3;--mut:#8b949e;--card:#161b22;--bd:#30363d;--ac:#388bfd;--ok:#3fb950;}
+*{box-sizing:border-box;}
+body{margin:0;background:var(--bg);color:var(--fg);font:15px/1.45 system-ui,sans-serif;}
+[hidden]{display:none!important;}
+.lh{position:sticky;top:0;z-index:2;display:flex;align-items:center;gap:8px;padding:10px 12px;background:#0f172a;color:#fff;}
+.lh .lt{flex:1;font-weight:700;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;}
+.lh button{background:none;border:1px solid #334155;color:#fff;border-radius:6px;padding:4px 10px;}
+.pw{position:sticky;top:44px;z-index:1;background:#000;}
+.pw video,.pw iframe{display:block;width:100%;aspect-ratio:16/9;border:0;background:#000;}
+#np{margin:0;padding:6px 12px;background:var(--card);border-bottom:1px solid var(--bd);font-weight:600;}
+#q{display:block;width:calc(100% - 16px);margin:8px;padding:9px 12px;border:1px solid var(--bd);border-radius:8px;background:var(--card);color:var(--fg);font-size:15px;}
+.bar{margin:0 8px;color:var(--mut);font-size:13px;}
+main{padding:0 8px 8px;}
+details{background:var(--card);border:1px solid var(--bd);border-radius:8px;margin:8px 0;}
+details details{margin:6px 8px;}
+summary{padding:11px 12px;font-weight:700;cursor:pointer;}
+summary b{font-weight:600;color:var(--mut);font-size:12px;margin-left:6px;}
+ol{list-style:none;margin:0;padding:0 8px 8px;}
+.l{display:flex;align-items:center;gap:6px;padding:7px 4px;border-top:1px solid var(--bd);}
+.l .lt{flex:1;min-width:0;overflow-wrap:anywhere;}
+.l.on{background:rgba(37,99,235,.12);}
+.l.done .lt{color:var(--mut);}
+.w{flex:none;width:28px;height:28px;border:1px solid var(--bd);border-radius:50%;background:none;color:var(--ok);}
+.p,.f{flex:none;padding:4px 9px;border-radius:6px;font-size:13px;font-weight:600;text-decoration:none;color:#fff;background:var(--ac);}
+.f{background:#dc2626;}
+.empty-msg{text-align:center;padding:40px;color:var(--mut);}
+footer{text-align:center;padding:20px;font-size:13px;}
+footer a{color:var(--ac);}
+"""
+
+_LITE_JS = r"""
+(function () {
+  var box   = document.getElementById('content-container');
+  var video = document.getElementById('v');
+  var yt    = document.getElementById('yt');
+  var np    = document.getElementById('np');
+  var prog  = document.getElementById('prog');
+  var watched = new Set(), lids = [], book = null, hls = null, hlsWait = null, cur = null;
+
+  function expand(a) {
+    if (a.dataset.url) return a.dataset.url;
+    if (!book) {
+      var src = document.getElementById('url-book');
+      book = src ? JSON.parse(src.textContent) : { p: [], s: [] };
+    }
+    var v = a.dataset.u, i = v.indexOf(':'), ref = v.slice(0, i).split(',');
+    return (ref[0] ? book.p[+ref[0]] : '') + v.slice(i + 1) + (ref[1] ? book.s[+ref[1]] : '');
+  }
+  function withHls(cb) {
+    if (window.Hls) return cb();
+    if (!hlsWait) {
+      hlsWait = [];
+      var s = document.createElement('script');
+      s.src = 'https://cdn.jsdelivr.net/npm/hls.js@1/dist/hls.light.min.js';
+      s.onload = s.onerror = function () { hlsWait.forEach(function (f) { f(); }); };
+      document.head.appendChild(s);
+    }
+    hlsWait.push(cb);
+  }
+  function load(url) {
+    if (url.indexOf('.m3u8') === -1 || video.canPlayType('application/vnd.apple.mpegurl')) {
+      video.src = url;
+      video.play().catch(function () {});
+      return;
+    }
+    withHls(function () {
+      if (!window.Hls || !Hls.isSupported()) { video.src = url; return; }
+      hls = new Hls();
+      hls.loadSource(url);
+      hls.attachMedia(video);
+      hls.on(Hls.Events.MANIFEST_PARSED, function () { video.play().catch(function () {}); });
+    });
+  }
+  function play(a) {
+    var li = a.closest('.l');
+    if (cur) cur.classList.remove('on');
+    cur = li;
+    li.classList.add('on');
+    np.textContent = li.querySelector('.lt').textContent;
+    document.getElementById('pw').hidden = false;
+    if (hls) { hls.destroy(); hls = null; }
+    video.pause();
+    if (a.dataset.yt) {
+      video.hidden = true;
+      yt.hidden    = false;
+      yt.src = 'https://www.youtube.com/embed/' + a.dataset.yt + '?autoplay=1';
+    } else {
+      yt.hidden    = true;
+      yt.src       = '';
+      video.hidden = false;
+      load(expand(a));
+    }
+  }
+
+  /* Watched state goes through the WATCHED STORE helpers, as on the full page. */
+  function save() {
+    try { localStorage.setItem(FILE_KEY + '_wb', JSON.stringify(_wEncode(lids, watched, true))); } catch (e) { return false; }
+    return true;
+  }
+  function mark(li, on) {
+    li.classList.toggle('done', on);
+    li.firstChild.textContent = on ? '✓' : '○';
+  }
+  function count() {
+    var n = box.querySelectorAll('.l').length;
+    prog.textContent = n ? box.querySelectorAll('.l.done').length + '/' + n + ' watched' : '';
+  }
+  function toggle(li) {
+    var lid = li.dataset.lid;
+    if (watched.has(lid)) watched.delete(lid); else watched.add(lid);
+    mark(li, watched.has(lid));
+    save();
+    count();
+  }
+
+  box.addEventListener('click', function (e) {
+    var t = e.target.closest('.p,.w');
+    if (!t) return;
+    if (t.classList.contains('w')) { toggle(t.parentNode); return; }
+    e.preventDefault();
+    play(t);
+  });
+  video.addEventListener('timeupdate', function () {
+    if (cur && video.duration > 0 && video.currentTime / video.duration > 0.8 &&
+        !watched.has(cur.dataset.lid)) toggle(cur);
+  });
+  video.addEventListener('ended', function () {
+    var li = cur && cur.closest('.l');
+    while (li && (li = box.querySelector('.l[data-gidx="' + (+li.dataset.gidx + 1) + '"]'))) {
+      var next = li.querySelector('.p');                 /* skip PDF-only lectures */
+      if (next) { play(next); return; }
+    }
+  });
+
+  var timer;
+  document.getElementById('q').addEventListener('input', function () {
+    var q = this.value.trim().toLowerCase();
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      box.querySelectorAll('.l').forEach(function (li) {
+        li.hidden = !!q && li.querySelector('.lt').textContent.toLowerCase().indexOf(q) === -1;
+      });
+      box.querySelectorAll('details').forEach(function (d) {
+        d.open = !!q && !!d.querySelector('.l:not([hidden])');
+      });
+    }, 250);
+  });
+  document.getElementById('dark').addEventListener('click', function () {
+    var d = document.documentElement.classList.toggle('dark');
+    try { localStorage.setItem('bbk_dark', d ? '1' : '0'); } catch (e) {}
+  });
+
+  (window.__contentReady || Promise.resolve()).then(function () {
+    var lis  = box.querySelectorAll('.l'), done;
+    lids    = Array.prototype.map.call(lis, function (li) { return li.dataset.lid; });
+    watched = _wRead(lids);
+    done    = _wFold(lids, watched);
+    lis.forEach(function (li) { if (watched.has(li.dataset.lid)) mark(li, true); });
+    if (done && save()) done();
+    count();
+  });
+})();
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  ASSET MINIFICATION
+# ═══════════════════════════════════════════════════════════════════════════
+# The embedded CSS/JS ship in every page, so they are squeezed once and the
+# result is cached on disk keyed by a hash of the source.  Both minifiers
+# are deliberately conservative: comments and layout whitespace go, tokens
+# are never rewritten.  Set TXTHTML_READABLE=1 (or pass readable=True to
+# write_html) to emit the sources untouched for debugging.
+
+_MINIFY_VERSION = "3"
+_CACHE_DIR      = os.environ.get("TXTHTML_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "txthtml-cache")
+READABLE        = os.environ.get("TXTHTML_READABLE", "").strip().lower() in ("1", "true", "yes", "on")
+
+_CSS_TOKEN_RE = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|/\*.*?\*/|\s+', re.DOTALL)
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,])\s*")
+_JS_TOKEN_RE  = re.compile(
+    r'(?P<ws>\s+)'
+    r'|(?P<comment>//[^\n]*|/\*.*?\*/)'
+    r'|(?P<str>"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|`(?:[^`\\]|\\.)*`)'
+    r'|(?P<word>[\w$]+)'
+    r'|(?P<punct>.)',
+    re.DOTALL,
+)
+_JS_REGEX_RE  = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*')
+# After these a "/" starts a regex literal, not a division.
+_JS_REGEX_AFTER = frozenset("return typeof case do else in of new delete void throw instanceof yield await".split())
+_JS_WORD_CHAR   = re.compile(r"[\w$]")
+
+
+def _minify_css(src: str) -> str:
+    def sub(m):
+        if m.group(1):
+            return m.group(1)
+        return "" if m.group().startswith("/*") else " "
+    out = _CSS_TOKEN_RE.sub(sub, src)
+    out = _CSS_PUNCT_RE.sub(r"\1", out)
+    out = re.sub(r":\s+", ":", out)
+    return out.replace(";}", "}").strip()
+
+
+def _minify_js(src: str) -> str:
+    """
+    Tokenize strings, template literals, regex literals and comments, then
+    drop comments and collapse whitespace between the remaining tokens: a
+    run with a line break stays one line break (ASI), any other run goes
+    unless two words, "+ +", "- -", "//" or "/*" would fuse without it.
+    """
+    out, pos, last, gap = [], 0, ("punct", "("), None     # last: previous code token
+    while pos < len(src):
+        m    = _JS_TOKEN_RE.match(src, pos)
+        kind = m.lastgroup
+        tok  = m.group()
+        if tok == "/" and (last[1] in _JS_REGEX_AFTER or last[0] == "punct" and last[1] not in ")]}"):
+            rx = _JS_REGEX_RE.match(src, pos)
+            if rx:
+                kind, tok = "str", rx.group()
+        pos += len(tok)
+        if kind in ("ws", "comment"):
+            if "\n" in tok:
+                gap = "\n"
+            elif gap is None:
+                gap = " "
+            continue
+        if gap and out:
+            a, b = out[-1][-1], tok[0]
+            if gap == "\n" or (_JS_WORD_CHAR.match(a) and _JS_WORD_CHAR.match(b)) or \
+                    (a == b and a in "+-") or (a == "/" and b in "/*"):
+                out.append(gap)
+        out.append(tok)
+        last, gap = (kind, tok), None
+    return "".join(out)
+
+
+def _cached_minify(kind: str, src: str) -> str:
+    digest = hashlib.sha256(f"{kind}:{_MINIFY_VERSION}:{src}".encode("utf-8")).hexdigest()[:32]
+    path   = os.path.join(_CACHE_DIR, f"{digest}.{kind}")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        pass
+    out = _minify_css(src) if kind == "css" else _minify_js(src)
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(out)
+        os.replace(tmp, path)
+    except OSError:
+        pass      # read-only FS — just minify again next start
+    return out
+
+
+_ASSET_SOURCES = {
+    "css":        ("css", _CSS),
+    "drawer_css": ("css", _DRAWER_CSS),
+    "watched_js": ("js",  _WATCHED_JS),
+    "js":         ("js",  _JS_BODY),
+    "drawer_js":  ("js",  _DRAWER_JS),
+    "anti_fouc":  ("js",  _ANTI_FOUC_JS),
+    "payload_js": ("js",  _PAYLOAD_JS),
+    "index_css":  ("css", _INDEX_CSS),
+    "index_js":   ("js",  _INDEX_JS),
+    "lite_css":   ("css", _LITE_CSS),
+    "lite_js":    ("js",  _LITE_JS),
+}
+
+
+def _assets(readable: bool) -> dict:
+    if readable:
+        return {name: src for name, (_, src) in _ASSET_SOURCES.items()}
+    return {name: _cached_minify(kind, src) for name, (kind, src) in _ASSET_SOURCES.items()}
+
+
+def minify_report() -> str:
+    """One-line summary of the bytes minification saves on every page."""
+    mini_assets = _assets(False)
+    names = ("css", "drawer_css", "watched_js", "js", "drawer_js", "anti_fouc")   # on every full page
+    raw   = sum(len(_ASSET_SOURCES[n][1].encode("utf-8")) for n in names)
+    mini  = sum(len(mini_assets[n].encode("utf-8")) for n in names)
+    return (f"[ASSETS] {raw / 1024:.1f} KiB -> {mini / 1024:.1f} KiB per page "
+            f"(saves {(raw - mini) / 1024:.1f} KiB, {100 * (raw - mini) / raw:.0f}%)")
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 #  MAIN ENTRY POINT
 # ═══════════════════════════════════════════════════════════════════════════
 
-def generate_html(file_name: str, structured_list: list) -> str:
-    content_html = _build_content_html(structured_list)
-    total        = count_total_lectures(structured_list)
-    js           = _build_js(file_name)
-    ename        = html.escape(file_name)
+_WRITE_BUFFER = 64 * 1024
+
+# Placeholders for the per-page values in the page template.  Everything
+# between them is constant and is encoded to UTF-8 once, at import time.
+_SLOT_TITLE   = "\x00title\x00"
+_SLOT_TOTAL   = "\x00total\x00"
+_SLOT_CONTENT = "\x00content\x00"
+_SLOT_KEY     = "\x00key\x00"
+_SLOT_RE      = re.compile(r"\x00(\w+)\x00")
+
+
+def _page_template(readable: bool) -> str:
+    a     = _assets(readable)
+    ename = _SLOT_TITLE
+    total = _SLOT_TOTAL
+    js    = "const FILE_KEY = " + _SLOT_KEY + ";\n" + a["watched_js"] + "\n" + a["js"] + "\n" + a["drawer_js"]
 
     lines = [
         '<!DOCTYPE html>',
@@ -1893,12 +4016,12 @@ def generate_html(file_name: str, structured_list: list) -> str:
         '<meta name="viewport" content="width=device-width,initial-scale=1.0">',
         '<meta name="theme-color" content="#0f172a">',
         f'<title>{ename}</title>',
-        f'<script>{_ANTI_FOUC_JS}</script>',
+        f'<script>{a["anti_fouc"]}</script>',
         '<link rel="preconnect" href="https://fonts.googleapis.com">',
         '<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.6.0/css/all.min.css">',
         '<link rel="stylesheet" href="https://cdn.plyr.io/3.7.8/plyr.css">',
-        f'<style>{_CSS}</style>',
-        f'<style>{_DRAWER_CSS}</style>',
+        f'<style>{a["css"]}</style>',
+        f'<style>{a["drawer_css"]}</style>',
         '</head>',
         '<body>',
 
@@ -1991,7 +4114,7 @@ def generate_html(file_name: str, structured_list: list) -> str:
         '    <span class="badge badge-progress" id="progress-badge" aria-live="polite"></span>',
         '  </div>',
 
-        f'  <div id="content-container" role="list" aria-label="Course content">{content_html}</div>',
+        '  <div id="content-container" role="list" aria-label="Course content">' + _SLOT_CONTENT + '</div>',
         '</main>',
 
         # ── Footer — Telegram link, text "Babu Bhai Kundan" ──
@@ -2022,3 +4145,506 @@ def generate_html(file_name: str, structured_list: list) -> str:
     ]
 
     return "\n".join(lines)
+
+
+def _lite_page_template(readable: bool) -> str:
+    a     = _assets(readable)
+    ename = _SLOT_TITLE
+    return "\n".join([
+        '<!DOCTYPE html>',
+        '<html lang="en">',
+        '<head>',
+        '<meta charset="UTF-8">',
+        '<meta name="viewport" content="width=device-width,initial-scale=1.0">',
+        '<meta name="theme-color" content="#0f172a">',
+        f'<title>{ename}</title>',
+        f'<script>{a["anti_fouc"]}</script>',
+        f'<style>{a["lite_css"]}</style>',
+        '</head>',
+        '<body>',
+        '<header class="lh">',
+        f'  <span class="lt">{ename}</span>',
+        '  <button id="dark" aria-label="Toggle dark mode">\u25d0</button>',
+        '</header>',
+        '<div class="pw" id="pw" hidden>',
+        '  <video id="v" controls playsinline preload="none" aria-label="Lecture video player"></video>',
+        '  <iframe id="yt" hidden allow="autoplay; fullscreen; encrypted-media; picture-in-picture"',
+        '    referrerpolicy="no-referrer-when-downgrade" allowfullscreen aria-label="YouTube video player"></iframe>',
+        '  <p id="np" aria-live="polite"></p>',
+        '</div>',
+        '<input type="search" id="q" placeholder="Search lectures\u2026" autocomplete="off" aria-label="Search lectures">',
+        f'<p class="bar">{_SLOT_TOTAL} lectures &middot; <span id="prog" aria-live="polite"></span></p>',
+        '<main id="content-container" aria-label="Course content">' + _SLOT_CONTENT + '</main>',
+        '<footer><a href="https://t.me/BabuBhaiKundan" target="_blank" rel="noopener noreferrer">Babu Bhai Kundan</a></footer>',
+        f'<script>const FILE_KEY = {_SLOT_KEY};\n{a["watched_js"]}\n{a["lite_js"]}</script>',
+        '</body>',
+        '</html>',
+    ])
+
+
+# profile -> page template builder
+_PAGE_TEMPLATES = {
+    "full":   _page_template,
+    "lite":   _lite_page_template,
+    "island": _page_template,
+}
+
+
+def _compile_shell(template: str) -> tuple:
+    """
+    Split the page template at the content slot into (head, tail), each a
+    tuple of ready-made UTF-8 blobs interleaved with slot names.
+    """
+    head, tail = [], []
+    cur = head
+    for i, part in enumerate(_SLOT_RE.split(template)):
+        if i % 2 == 0:
+            if part:
+                cur.append(part.encode("utf-8"))
+        elif part == "content":
+            cur = tail
+        else:
+            cur.append(part)
+    return tuple(head), tuple(tail)
+
+
+_SHELLS = {}
+
+
+_Shell = collections.namedtuple("_Shell", "head tail payload_tail")
+
+
+def _get_shell(readable: bool, profile: str = "full") -> _Shell:
+    shell = _SHELLS.get((readable, profile))
+    if shell is None:
+        head, tail   = _compile_shell(_PAGE_TEMPLATES[profile](readable))
+        payload_tail = ("</script><script>" + _assets(readable)["payload_js"] + "</script>").encode("utf-8")
+        shell = _SHELLS[readable, profile] = _Shell(head, tail, payload_tail)
+    return shell
+
+
+_get_shell(READABLE)
+
+
+def _write_shell(fp, segments: tuple, slots: dict) -> None:
+    for seg in segments:
+        fp.write(seg if type(seg) is bytes else slots[seg])
+
+
+def _iter_blocks(chunks):
+    """Group str fragments into encoded ~_WRITE_BUFFER sized blocks."""
+    pending, size = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= _WRITE_BUFFER:
+            yield "".join(pending).encode("utf-8")
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def _iter_content_blocks(structured: Course, pool=None, profile: str = "full"):
+    """Encoded course markup in ~_WRITE_BUFFER sized blocks."""
+    if pool is not None and len(structured) > 1:
+        # One block per subject, rendered in pool and yielded in order.
+        book    = _build_url_book(structured)
+        offsets = itertools.accumulate((s.lecture_count for s in structured), initial=0)
+        yield "".join(_content_head(structured, book, profile)).encode("utf-8")
+        yield from pool.map(_render_subject, structured, range(len(structured)), offsets,
+                            itertools.repeat(book), itertools.repeat(profile))
+        yield _CONTENT_WRAP.get(profile, ("", ""))[1].encode("utf-8")
+        return
+    yield from _iter_blocks(_iter_content_html(structured, profile=profile))
+
+
+def _write_payload(fp, blocks, compress: str, shell: _Shell) -> None:
+    """Deflate the content blocks and write them base64-encoded for _PAYLOAD_JS."""
+    comp  = zlib.compressobj(6, zlib.DEFLATED, _PAYLOAD_WBITS[compress])
+    carry = b""
+    fp.write(f'<script type="application/octet-stream" id="course-payload" data-enc="{compress}">'.encode("ascii"))
+    for block in blocks:
+        data  = carry + comp.compress(block)
+        cut   = len(data) - len(data) % 3            # base64 needs 3-byte groups
+        carry = data[cut:]
+        fp.write(base64.b64encode(data[:cut]))
+    fp.write(base64.b64encode(carry + comp.flush()))
+    fp.write(shell.payload_tail)
+
+
+def write_html(file_name: str, structured: Course, fp, readable: bool = None,
+               compress: str = None, pool=None, profile: str = "full") -> None:
+    """
+    Stream the finished page into a binary file object.
+    Lectures are rendered one at a time and flushed in ~64 KB blocks, so
+    memory stays at one block instead of several copies of the page.
+    readable=True embeds the un-minified CSS/JS (default: READABLE).
+    compress="gzip" or "deflate" ships the course markup compressed and
+    base64-encoded; the page inflates it on load.
+    pool (an Executor) renders the subjects in parallel.
+    profile="lite" writes the low-end-device page (see _LITE_JS); it cannot
+    be compressed, as the old browsers it targets lack DecompressionStream.
+    profile="island" ships the course as JSON that the page renders lazily.
+    """
+    if compress is not None and compress not in _PAYLOAD_WBITS:
+        raise ValueError(f"compress must be one of {', '.join(_PAYLOAD_WBITS)}")
+    if profile not in _PAGE_TEMPLATES:
+        raise ValueError(f"profile must be one of {', '.join(_PAGE_TEMPLATES)}")
+    if compress is not None and profile == "lite":
+        raise ValueError("lite pages are never compressed")
+    shell = _get_shell(READABLE if readable is None else readable, profile)
+    _write_page(fp, shell, file_name, file_name, count_total_lectures(structured),
+                _iter_content_blocks(structured, pool, profile), compress)
+
+
+def _write_page(fp, shell: _Shell, title: str, key_name: str, total: int, blocks,
+                compress: str) -> None:
+    slots = {
+        "title": html.escape(title).encode("utf-8"),
+        "total": str(total).encode("ascii"),
+        "key":   _file_key(key_name).encode("ascii"),
+    }
+    _write_shell(fp, shell.head, slots)
+    if compress:
+        _write_payload(fp, blocks, compress, shell)
+    else:
+        for block in blocks:
+            fp.write(block)
+    _write_shell(fp, shell.tail, slots)
+
+
+def generate_html(file_name: str, structured_list: Course, **options) -> str:
+    buf = io.BytesIO()
+    write_html(file_name, structured_list, buf, **options)
+    return buf.getvalue().decode("utf-8")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  SPLIT OUTPUT  (index.html + one page per subject, zipped)
+# ═══════════════════════════════════════════════════════════════════════════
+# Every page shares the course FILE_KEY, so watched/resume state is common,
+# and keeps global data-gidx numbering; #page-nav tells the runtime which
+# gidx range lives here and which neighbour page to open (page#play=N)
+# when Prev/Next runs off either end.
+
+def _split_page_names(structured: Course) -> list:
+    names = []
+    for n, sub in enumerate(structured, 1):
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", sub.name).strip("-")[:40]
+        names.append(f"{n:02d}-{slug or 'subject'}.html")
+    return names
+
+
+def _iter_subject_page(sub: Subject, global_idx: int, nav: dict):
+    data = json.dumps(nav).replace("</", "<\\/")
+    yield f'<script type="application/json" id="page-nav">{data}</script>'
+    yield '<a class="page-back" href="index.html">&#8592; All subjects</a>'
+    book = _build_url_book((sub,))
+    yield from _content_head((sub,), book, "full")
+    yield from _iter_subject_html(sub, 0, global_idx, book)
+
+
+def _index_html(file_name: str, structured: Course, pages: list, readable: bool) -> str:
+    a     = _assets(readable)
+    ename = html.escape(file_name)
+    total = count_total_lectures(structured)
+    links = []
+    for sub, page in zip(structured, pages):
+        links.append(
+            f'<div class="accordion-item">'
+            f'<a class="accordion-header index-link" href="{page}" data-count="{sub.lecture_count}">'
+            f'<span class="sub-name">{html.escape(sub.name)}</span>'
+            f'<span class="sub-count" aria-label="{sub.lecture_count} lectures">{sub.lecture_count}</span>'
+            f'<span class="sub-progress"></span>'
+            f'<span class="acc-arrow" aria-hidden="true">&#8250;</span>'
+            f'</a></div>'
+        )
+    return "\n".join([
+        '<!DOCTYPE html>',
+        '<html lang="en">',
+        '<head>',
+        '<meta charset="UTF-8">',
+        '<meta name="viewport" content="width=device-width,initial-scale=1.0">',
+        '<meta name="theme-color" content="#0f172a">',
+        f'<title>{ename}</title>',
+        f'<script>{a["anti_fouc"]}</script>',
+        f'<style>{a["css"]}</style>',
+        f'<style>{a["index_css"]}</style>',
+        '</head>',
+        '<body>',
+        '<header class="header" role="banner">',
+        f'  <span class="header-title">{ename}</span>',
+        '  <div class="header-controls">',
+        '    <button onclick="toggleDark()" class="ctrl-btn" title="Toggle dark mode" aria-label="Toggle dark mode">\U0001f319</button>',
+        '  </div>',
+        '</header>',
+        '<div class="progress-bar-track" role="progressbar" aria-label="Overall progress">',
+        '  <div class="progress-bar-fill" id="progress-fill"></div>',
+        '</div>',
+        '<main class="index-wrap">',
+        '  <div class="toolbar">',
+        f'    <span class="badge">{len(pages)} subjects &middot; {total} lectures</span>',
+        '    <span class="badge badge-progress" id="progress-badge"></span>',
+        '  </div>',
+        *links,
+        '</main>',
+        f'<script>const FILE_KEY = {_file_key(file_name)};\n{a["index_js"]}</script>',
+        '</body>',
+        '</html>',
+    ])
+
+
+def write_split(file_name: str, structured: Course, fp, readable: bool = None,
+                compress: str = None) -> list:
+    """
+    Write the course into fp as a zip: <file>/index.html plus one page per
+    subject, each holding only that subject's DOM.  Returns the member names.
+    """
+    if compress is not None and compress not in _PAYLOAD_WBITS:
+        raise ValueError(f"compress must be one of {', '.join(_PAYLOAD_WBITS)}")
+    readable = READABLE if readable is None else readable
+    shell    = _get_shell(readable)
+    folder   = json.loads(_file_key(file_name)) or "course"
+    pages    = _split_page_names(structured)
+    total    = count_total_lectures(structured)
+    members  = [f"{folder}/index.html"]
+
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(members[0], _index_html(file_name, structured, pages, readable))
+        first = 0
+        for n, sub in enumerate(structured):
+            nav = {
+                "self":  pages[n],
+                "prev":  pages[n - 1] if n else None,
+                "next":  pages[n + 1] if n + 1 < len(pages) else None,
+                "first": first,
+                "last":  first + sub.lecture_count - 1,
+                "total": total,
+            }
+            members.append(f"{folder}/{pages[n]}")
+            with zf.open(members[-1], "w") as out:
+                _write_page(out, shell, f"{file_name} · {sub.name}", file_name,
+                            sub.lecture_count, _iter_blocks(_iter_subject_page(sub, first, nav)),
+                            compress)
+            first += sub.lecture_count
+    return members
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  FILE CONVERSION  (runs in a worker process — see main.py)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _parse_file(path: str, fmt: str, candidates: list, fallback: str) -> Course:
+    """structure_data_in_order over path in the first of candidates that decodes all of it."""
+    for enc in candidates:
+        try:
+            with open(path, "rb") as f:
+                return structure_data_in_order(iter_names_and_urls(f, enc, fmt=fmt))
+        except UnicodeDecodeError:
+            continue
+    with open(path, "rb") as f:
+        return structure_data_in_order(iter_names_and_urls(f, fallback, fmt=fmt, errors="replace"))
+
+
+def convert_file(txt_path: str, html_path: str, file_name: str, encodings=("utf-8",),
+                 compress_min_lectures: int = 0, parallel_min_bytes: int = 0,
+                 workers: int = 1, split_min_lectures: int = 0,
+                 split_min_subjects: int = 0, profile: str = "full",
+                 island_min_lectures: int = 0) -> tuple:
+    """
+    Convert txt_path into html_path and return (output_path, lecture_count).
+    Self-contained and picklable so it can be handed to a process pool;
+    raises UnicodeError if none of encodings can decode the input.
+    Courses with at least compress_min_lectures lectures (0 = never) are
+    written as a gzip-payload page, except with profile="lite".  Plain-text
+    inputs of at least parallel_min_bytes (0 = never) are parsed and
+    rendered by a pool of workers processes; workers is the caller's budget
+    for this one file, its own process included, and 1 (the default) keeps
+    everything in this process.  Courses with at least
+    split_min_lectures lectures in split_min_subjects subjects (0 = never)
+    become a write_split() zip next to html_path instead (full profile
+    only; profile="lite" always writes one lite page).  Otherwise full-profile
+    courses with at least island_min_lectures lectures (0 = never) are
+    written with profile="island".
+    """
+    with open(txt_path, "rb") as f:
+        fmt, encoding = sniff_input(f, encodings)
+        size          = f.seek(0, os.SEEK_END)
+    if encoding is None:
+        raise UnicodeError(f"{txt_path}: not decodable as any of {', '.join(encodings)}")
+    parallel = (parallel_min_bytes and size >= parallel_min_bytes and workers > 1
+                and _can_split(fmt, encoding))
+
+    # The encoding is judged on the samples only: a byte further in that it
+    # cannot decode restarts the parse with the next candidate, and only if
+    # none reads the whole file do bad bytes become U+FFFD.
+    candidates = list(encodings[encodings.index(encoding):] if encoding in encodings else (encoding,))
+    with (concurrent.futures.ProcessPoolExecutor(workers) if parallel
+          else contextlib.nullcontext()) as pool:
+        structured = None
+        if pool is not None:
+            try:
+                structured = parse_parallel(txt_path, encoding, pool, workers, errors="strict")
+            except UnicodeDecodeError:
+                del candidates[0]
+        if structured is None:
+            structured = _parse_file(txt_path, fmt, candidates, encoding)
+        total = count_total_lectures(structured)
+        if (profile == "full" and split_min_lectures and split_min_subjects
+                and total >= split_min_lectures and len(structured) >= split_min_subjects):
+            # The zip is already deflated, so pages skip the gzip payload.
+            out_path = os.path.splitext(html_path)[0] + ".zip"
+            with open(out_path, "wb") as f:
+                write_split(file_name, structured, f)
+            return out_path, total
+        compress = ("gzip" if profile != "lite" and compress_min_lectures
+                    and total >= compress_min_lectures else None)
+        if profile == "full" and island_min_lectures and total >= island_min_lectures:
+            profile = "island"
+        with open(html_path, "wb") as f:
+            write_html(file_name, structured, f, compress=compress, pool=pool, profile=profile)
+    return html_path, total
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  COMMAND LINE  —  python -m txthtml convert IN_DIR OUT_DIR
+# ═══════════════════════════════════════════════════════════════════════════
+# Offline bulk conversion (no Telegram, Mongo or network).  Every input is
+# hashed together with this module's source and the options, and the digest
+# is kept in OUT_DIR/.txthtml-manifest.json, so a re-run only redoes the
+# files — or, after a template change, everything — that actually changed.
+
+_CLI_ENCODINGS = ("utf-8", "utf-8-sig", "cp1252", "latin-1")   # same as the bot
+_MANIFEST_NAME = ".txthtml-manifest.json"
+
+
+def _cli_fingerprint(options: dict) -> str:
+    with open(__file__, "rb") as f:
+        src = f.read()
+    return hashlib.sha256(src + json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+
+def _cli_job(src: str, html_path: str, name: str, fingerprint: str, known_hash: str,
+             known_out: str, options: dict) -> dict:
+    """Worker: hash src, then convert it unless the manifest entry still matches."""
+    t0     = time.perf_counter()
+    digest = hashlib.sha256(fingerprint.encode())
+    size   = 0
+    with open(src, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+            size += len(block)
+    digest = digest.hexdigest()
+    if digest == known_hash and known_out and os.path.exists(known_out):
+        return {"status": "skipped", "hash": digest, "out": known_out, "bytes": size, "lectures": 0}
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+    out, total = convert_file(src, html_path, name, _CLI_ENCODINGS, **options)
+    return {"status": "converted", "hash": digest, "out": out, "bytes": size,
+            "lectures": total, "seconds": time.perf_counter() - t0}
+
+
+def _cli_save_manifest(path: str, manifest: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _cli_convert(args) -> int:
+    in_dir, out_dir = os.path.abspath(args.in_dir), os.path.abspath(args.out_dir)
+    exts    = tuple(e.lower() if e.startswith(".") else "." + e.lower() for e in args.ext)
+    sources = []
+    for root, dirs, files in os.walk(in_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != out_dir)
+        sources.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(exts))
+
+    options = {
+        "compress_min_lectures": args.compress_min_lectures,
+        "split_min_lectures":    args.split_min_lectures,
+        "split_min_subjects":    args.split_min_subjects,
+        "profile":               args.profile,
+        "island_min_lectures":   args.island_min_lectures,
+    }
+    fingerprint   = _cli_fingerprint(options)
+    manifest_path = os.path.join(out_dir, _MANIFEST_NAME)
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+    manifest = {}
+
+    stats = collections.Counter()
+    t0    = last = time.perf_counter()
+    tty   = sys.stderr.isatty()
+
+    def report(done: int, final: bool = False) -> None:
+        dt   = max(time.perf_counter() - t0, 1e-9)
+        line = (f"[{done}/{len(sources)}] {stats['converted']} converted, {stats['skipped']} unchanged, "
+                f"{stats['failed']} failed | {done / dt:.1f} files/s, "
+                f"{stats['bytes'] / dt / 2**20:.1f} MiB/s, {stats['lectures'] / dt:.0f} lectures/s")
+        print(("\r" if tty else "") + line, end="\n" if final or not tty else "", file=sys.stderr, flush=True)
+
+    with concurrent.futures.ProcessPoolExecutor(args.jobs or None) as pool:
+        futures = {}
+        for src in sources:
+            rel   = os.path.relpath(src, in_dir)
+            dst   = os.path.join(out_dir, os.path.splitext(rel)[0] + ".html")
+            prev  = old.get(rel, {})
+            known = os.path.join(out_dir, prev["out"]) if prev.get("out") else ""
+            fut   = pool.submit(_cli_job, src, dst, os.path.splitext(os.path.basename(rel))[0],
+                                fingerprint, None if args.force else prev.get("hash"), known, options)
+            futures[fut] = rel
+
+        for done, fut in enumerate(concurrent.futures.as_completed(futures), 1):
+            rel = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(("\n" if tty else "") + f"FAILED {rel}: {e}", file=sys.stderr)
+            else:
+                stats[res["status"]] += 1
+                stats["bytes"]       += res["bytes"]
+                stats["lectures"]    += res["lectures"]
+                manifest[rel] = {"hash": res["hash"], "out": os.path.relpath(res["out"], out_dir)}
+            if done % 200 == 0:
+                _cli_save_manifest(manifest_path, {**old, **manifest})
+            now = time.perf_counter()
+            if now - last >= (0.2 if tty else 5) or done == len(sources):
+                last = now
+                report(done, final=done == len(sources))
+
+    # Inputs that disappeared drop out of the manifest; their outputs stay.
+    _cli_save_manifest(manifest_path, manifest)
+    if not sources:
+        print(f"No {'/'.join(exts)} files under {in_dir}", file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+
+def cli(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m txthtml", description="TXT → HTML batch converter")
+    sub    = parser.add_subparsers(dest="command", required=True)
+    conv   = sub.add_parser("convert", help="convert every batch file under IN_DIR into OUT_DIR")
+    conv.add_argument("in_dir")
+    conv.add_argument("out_dir")
+    conv.add_argument("-j", "--jobs", type=int, default=0, help="worker processes (default: one per CPU)")
+    conv.add_argument("--force", action="store_true", help="reconvert even if unchanged")
+    conv.add_argument("--ext", action="append", default=None, help="input extension (repeatable, default .txt)")
+    conv.add_argument("--profile", choices=sorted(_PAGE_TEMPLATES), default="full")
+    conv.add_argument("--compress-min-lectures", type=int, default=0, metavar="N")
+    conv.add_argument("--split-min-lectures", type=int, default=0, metavar="N")
+    conv.add_argument("--split-min-subjects", type=int, default=0, metavar="N")
+    conv.add_argument("--island-min-lectures", type=int, default=0, metavar="N")
+    args = parser.parse_args(argv)
+    args.ext = args.ext or [".txt"]
+    return _cli_convert(args)
+
+
+if __name__ == "__main__":
+    # Re-enter through the importable module so pool workers pickle
+    # txthtml._cli_job rather than __main__._cli_job.
+    import txthtml
+    sys.exit(txthtml.cli())
@@ -27,6 +27,44 @@ else:
 # Space-separated admin Telegram user IDs  e.g. "123456789 987654321"
 ADMINS = [int(x) for x in environ.get("ADMINS", "5096393058").split() if x.strip().isdigit()]
 
+# Worker processes for TXT → HTML conversion (0 / unset = one per CPU core)
+try:
+    CONVERT_WORKERS = int(environ.get("CONVERT_WORKERS", "0")) or os.cpu_count() or 1
+except ValueError:
+    CONVERT_WORKERS = os.cpu_count() or 1
+
+# Courses with at least this many lectures are sent as a compressed-payload
+# HTML (much smaller upload, same page once opened); lite pages never are.
+# 0 = never compress.
+try:
+    COMPRESS_MIN_LECTURES = int(environ.get("COMPRESS_MIN_LECTURES", "1000"))
+except ValueError:
+    COMPRESS_MIN_LECTURES = 1000
+
+# TXT files at least this big (MB) are parsed and rendered across the
+# CONVERT_WORKERS slots other conversions leave free, instead of in a single
+# worker (nothing changes when CONVERT_WORKERS is 1). 0 = never, the default:
+# the split parse has not yet beaten one worker (see bench.py parallel).
+try:
+    PARALLEL_MIN_MB = float(environ.get("PARALLEL_MIN_MB", "0"))
+except ValueError:
+    PARALLEL_MIN_MB = 0
+
+# Courses this big are sent as a ZIP (index.html + one page per subject)
+# instead of one heavy HTML. Both limits must be reached; 0 = never split.
+try:
+    SPLIT_MIN_LECTURES = int(environ.get("SPLIT_MIN_LECTURES", "3000"))
+    SPLIT_MIN_SUBJECTS = int(environ.get("SPLIT_MIN_SUBJECTS", "12"))
+except ValueError:
+    SPLIT_MIN_LECTURES, SPLIT_MIN_SUBJECTS = 3000, 12
+
+# Courses with at least this many lectures ship their lecture list as JSON
+# that the page renders on demand (much lighter to open). 0 = never.
+try:
+    ISLAND_MIN_LECTURES = int(environ.get("ISLAND_MIN_LECTURES", "5000"))
+except ValueError:
+    ISLAND_MIN_LECTURES = 5000
+
 
 # ========================================
 # Proxy Configuration